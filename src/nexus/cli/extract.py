@@ -20,7 +20,7 @@ from nexus.cli.formatting import (
     print_statistics,
 )
 from nexus.cli.main import pass_context
-from nexus.extraction.pipeline import process_pdf_to_chunks
+from nexus.extraction.pipeline import init_directory_worker, process_pdf_to_chunks
 
 def _process_single_pdf(args):
     """Helper for multiprocessing."""
@@ -37,6 +37,10 @@ def _process_single_pdf(args):
         ocr_dpi,
         math_ocr,
         math_ocr_engine,
+        math_image_format,
+        math_drawing_cache,
+        refresh_math_drawing_cache,
+        math_workers,
         inline_math,
         merge_table_continuations,
         split_references,
@@ -60,6 +64,10 @@ def _process_single_pdf(args):
             ocr_dpi=ocr_dpi,
             math_ocr=math_ocr,
             math_ocr_engine=math_ocr_engine,
+            math_image_format=math_image_format,
+            math_drawing_cache_dir=math_drawing_cache,
+            refresh_math_drawing_cache=refresh_math_drawing_cache,
+            math_workers=math_workers,
             inline_math=inline_math,
             merge_table_continuations=merge_table_continuations,
             split_references=split_references,
@@ -122,9 +130,9 @@ def _process_single_pdf(args):
 )
 @click.option(
     "--ocr-engine",
-    type=click.Choice(["tesseract"], case_sensitive=False),
+    type=click.Choice(["tesseract", "tesserocr"], case_sensitive=False),
     default="tesseract",
-    help="OCR engine to use.",
+    help="OCR engine to use (tesserocr keeps the model loaded in-process).",
 )
 @click.option(
     "--ocr-dpi",
@@ -143,6 +151,30 @@ def _process_single_pdf(args):
     default="pix2tex",
     help="Math OCR engine to use.",
 )
+@click.option(
+    "--math-image-format",
+    type=click.Choice(["png", "jpeg", "webp"], case_sensitive=False),
+    default="png",
+    help="Image format for extracted math crops.",
+)
+@click.option(
+    "--math-drawing-cache",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory caching per-page drawing boxes, so reruns skip path extraction.",
+)
+@click.option(
+    "--refresh-math-drawing-cache",
+    is_flag=True,
+    default=False,
+    help="Recompute and overwrite cached drawing boxes.",
+)
+@click.option(
+    "--math-workers",
+    type=int,
+    default=None,
+    help="Math scanning processes per PDF (default: 1 while PDFs run in parallel).",
+)
 @click.option(
     "--inline-math/--no-inline-math",
     default=None,
@@ -185,6 +217,10 @@ def extract(
     ocr_dpi: int,
     math_ocr: bool,
     math_ocr_engine: str,
+    math_image_format: str,
+    math_drawing_cache: Optional[Path],
+    refresh_math_drawing_cache: bool,
+    math_workers: Optional[int],
     inline_math: bool,
     merge_table_continuations: bool,
     split_references: bool,
@@ -266,6 +302,10 @@ def extract(
             ocr_dpi,
             math_ocr,
             math_ocr_engine,
+            math_image_format,
+            math_drawing_cache,
+            refresh_math_drawing_cache,
+            math_workers,
             inline_math,
             merge_table_continuations,
             split_references,
@@ -284,7 +324,11 @@ def extract(
     ) as progress:
         task = progress.add_task("Extracting...", total=len(pdf_files), stats="(0/0)")
         
-        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Same per-worker setup as process_directory: each PDF worker keeps its
+        # OCR/table/math stages single-process, so N workers use ~N cores
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=init_directory_worker
+        ) as executor:
             # Map futures to pdf filenames for error reporting
             futures = {executor.submit(_process_single_pdf, t): t[0].name for t in tasks}
             
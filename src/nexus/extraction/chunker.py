@@ -390,7 +390,7 @@ def chunk_pages(
 
     for page in pages:
         # Skip reference pages (they're handled separately)
-        if page.metadata.get("is_references", False):
+        if page.is_references:
             continue
 
         page_num = page.page_number
@@ -190,6 +190,7 @@ def build_reference_library(references_text: str, source_file: str = "") -> Refe
 
 # Pattern to find citations in text: [1], [12], [1,2,3], [1-3]
 CITATION_PATTERN = re.compile(r'\[(\d+(?:[,\-–]\s*\d+)*)\]')
+CITATION_RANGE_SPLIT = re.compile(r'[-–]')
 
 try:
     from rapidfuzz import process, fuzz
@@ -205,7 +206,7 @@ def extract_citation_numbers(text: str) -> set[int]:
         citation_str = match.group(1)
         # Handle ranges like "1-3" or "1–3"
         if '-' in citation_str or '–' in citation_str:
-            parts = re.split(r'[-–]', citation_str)
+            parts = CITATION_RANGE_SPLIT.split(citation_str)
             if len(parts) == 2:
                 try:
                     start, end = int(parts[0].strip()), int(parts[1].strip())
@@ -9,15 +9,106 @@ It uses an LLM to "fill in the blanks" defined by a YAML schema.
 import json
 import yaml
 import csv
+import hashlib
 import os
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Any, List, Dict
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Dict, Optional, Sequence
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+
+from nexus.utils.rate_limit import TokenBucket
+
+if TYPE_CHECKING:
+    from .pipeline import ProcessedDocument
 
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import (
+        OpenAI,
+        APIConnectionError,
+        APITimeoutError,
+        InternalServerError,
+        RateLimitError,
+    )
+    # Transient failures worth retrying instead of dropping the row
+    RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+        RateLimitError,
+        APIConnectionError,
+        APITimeoutError,
+        InternalServerError,
+    )
 except ImportError:
     OpenAI = None
+    RETRYABLE_ERRORS = ()
+
+# Optional exact token counting for rate-limit accounting
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Optional fast JSON (C serializer) for chunk/table hot paths
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional incremental JSON parsing so chunks files needn't be loaded whole
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Fallback hard limit when no embedder is available (approx 12k tokens)
+MAX_CONTEXT_CHARS = 50000
+
+# Stop adding ranked chunks once similarity drops by more than this between neighbours
+RELEVANCE_SCORE_GAP = 0.15
+
+# Chunk texts embedded per encode call while a paper's chunks are streamed
+EMBED_BATCH_SIZE = 64
+
+# Bump whenever _build_system_prompt changes so cached rows are invalidated
+PROMPT_VERSION = 2
+
+# Feedback retries when the model's structured output fails schema validation
+MAX_VALIDATION_RETRIES = 2
+
+# Exponential backoff for transient API errors: base * 2**attempt plus jitter,
+# unless the server says how long to wait via Retry-After
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+# Prompt compression: sections with no extraction value, and the size above
+# which a chunk is cut down to its schema-relevant sentences
+BOILERPLATE_PATTERN = re.compile(
+    r"^\W*(acknowledg|funding|author contrib|conflicts? of interest|competing interest)",
+    re.IGNORECASE,
+)
+MARKDOWN_DECORATION_PATTERN = re.compile(r"^\s*(?:#{1,6}\s+|[-*_]{3,}\s*$|>\s?)|\*\*|__|`", re.MULTILINE)
+PARAGRAPH_SPLIT_PATTERN = re.compile(r"\n\s*\n")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+")
+KEYWORD_PATTERN = re.compile(r"[a-z][a-z0-9-]{3,}")
+COMPRESSION_MIN_CHARS = 2000
+KEYWORD_STOPWORDS = frozenset({
+    "that", "this", "with", "from", "what", "which", "were", "was", "have",
+    "does", "there", "their", "used", "uses", "using", "paper", "study",
+    "value", "values", "whether", "other", "into", "only", "such",
+})
+
+COLUMN_TYPES: dict[str, type] = {
+    "text": str,
+    "number": float,
+    "boolean": bool,
+}
+
 
 @dataclass
 class ColumnSchema:
@@ -45,18 +136,219 @@ class MatrixSchema:
             ))
         return cls(columns=cols)
 
+def build_row_model(columns: List[ColumnSchema]) -> type[BaseModel]:
+    """
+    Build a Pydantic model for one matrix row from the schema columns.
+
+    Column names may contain spaces or punctuation, so fields get identifier-safe
+    names and keep the original column name as their JSON alias.
+    """
+    fields: dict[str, tuple[Any, Any]] = {}
+    for i, col in enumerate(columns):
+        field_name = re.sub(r"\W", "_", col.name).strip("_").lower() or f"col_{i}"
+        if field_name[0].isdigit() or field_name in fields:
+            field_name = f"col_{i}_{field_name}"
+        col_type = COLUMN_TYPES.get(col.type, str)
+        fields[field_name] = (
+            Optional[col_type],
+            Field(default=None, alias=col.name, description=col.description),
+        )
+    return create_model(
+        "MatrixRow",
+        __config__=ConfigDict(populate_by_name=True),
+        **fields,
+    )
+
+
+def _retry_after_seconds(error: Exception) -> float | None:
+    """Seconds the server asked us to wait (Retry-After header), if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # Retry-After may also be an HTTP date
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _strict_json_schema(model: type[BaseModel]) -> dict[str, Any]:
+    """
+    JSON schema for a row model in the form strict structured outputs accept.
+
+    Strict mode wants every property listed as required (nullable instead of
+    optional) and no extra properties, so the None defaults are dropped.
+    """
+    schema = model.model_json_schema(by_alias=True)
+    properties = schema.get("properties", {})
+    for prop in properties.values():
+        prop.pop("default", None)
+    schema["required"] = list(properties)
+    schema["additionalProperties"] = False
+    return schema
+
+
+def _schema_keywords(columns: List[ColumnSchema]) -> frozenset[str]:
+    """Lowercased content words from the column names and descriptions."""
+    words = set()
+    for col in columns:
+        words.update(KEYWORD_PATTERN.findall(f"{col.name} {col.description}".lower()))
+    return frozenset(words - KEYWORD_STOPWORDS)
+
+
+def _compress_chunk(text: str, keywords: frozenset[str]) -> str:
+    """
+    Shrink a chunk's text before it is sent to the LLM.
+
+    Drops acknowledgement/funding-style paragraphs, strips Markdown decoration
+    and collapses whitespace. Chunks still longer than COMPRESSION_MIN_CHARS
+    keep only the sentences that mention a schema keyword.
+    """
+    paragraphs = []
+    in_boilerplate = False
+    for paragraph in PARAGRAPH_SPLIT_PATTERN.split(text):
+        if paragraph.lstrip().startswith("#"):
+            # A heading opens a new section; skip its body if it is boilerplate
+            in_boilerplate = bool(BOILERPLATE_PATTERN.match(paragraph))
+            if in_boilerplate:
+                continue
+        elif in_boilerplate or BOILERPLATE_PATTERN.match(paragraph):
+            continue
+        paragraphs.append(paragraph)
+    text = MARKDOWN_DECORATION_PATTERN.sub("", "\n\n".join(paragraphs))
+    text = WHITESPACE_PATTERN.sub(" ", text).strip()
+    if len(text) <= COMPRESSION_MIN_CHARS or not keywords:
+        return text
+
+    kept = []
+    for sentence in SENTENCE_SPLIT_PATTERN.split(text):
+        lowered = sentence.lower()
+        if any(keyword in lowered for keyword in keywords):
+            kept.append(sentence)
+    # Nothing matched: keep the opening rather than send an empty chunk
+    return " ".join(kept) if kept else text[:COMPRESSION_MIN_CHARS]
+
+
+class ExtractionCache:
+    """
+    Content-addressable on-disk cache of extracted rows.
+
+    Entries are keyed by (provider, model, prompt_version, paper_id, chunks hash,
+    config hash), so a rerun with unchanged inputs, schema prompt and context
+    settings skips the LLM call.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _update_hash(h: "hashlib._Hash", chunk: Dict) -> None:
+        """Feed one chunk canonically; each record is length-prefixed to avoid collisions."""
+        if HAS_ORJSON:
+            b = orjson.dumps(chunk, option=orjson.OPT_SORT_KEYS)
+        else:
+            b = json.dumps(chunk, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        h.update(len(b).to_bytes(8, "little"))
+        h.update(b)
+
+    @staticmethod
+    def hash_chunks(chunks: Iterable[Dict]) -> str:
+        """Hash chunks canonically."""
+        h = hashlib.sha256()
+        for chunk in chunks:
+            ExtractionCache._update_hash(h, chunk)
+        return h.hexdigest()
+
+    @staticmethod
+    def iter_hashed(chunks: Iterable[Dict], h: "hashlib._Hash") -> Iterator[Dict]:
+        """Yield chunks unchanged, feeding each one into h as it is consumed."""
+        for chunk in chunks:
+            ExtractionCache._update_hash(h, chunk)
+            yield chunk
+
+    @staticmethod
+    def hash_config(system_prompt: str, **settings: Any) -> str:
+        """Hash the schema-derived system prompt and the context-selection settings."""
+        config = json.dumps([system_prompt, settings], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        prompt_version: int,
+        paper_id: str,
+        chunks_hash: str,
+        config_hash: str = "",
+    ) -> str:
+        key = json.dumps([provider, model, prompt_version, paper_id, chunks_hash, config_hash])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Dict | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            data = path.read_bytes()
+            entry = orjson.loads(data) if HAS_ORJSON else json.loads(data)
+        except Exception:
+            return None
+        row = entry.get("row") if isinstance(entry, dict) else None
+        return row if isinstance(row, dict) else None
+
+    def put(self, key: str, row: Dict, metadata: Dict) -> None:
+        """Atomically write a row (temp file + rename) so readers never see partial JSON."""
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps({"row": row, "metadata": metadata}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+
+
 class MatrixAgent:
     def __init__(
         self, 
         schema_path: str | Path,
         base_url: str | None = None, # e.g. "http://localhost:11434/v1" for Ollama
         api_key: str | None = None,
-        model: str = "gpt-4o-mini"
+        model: str = "gpt-4o-mini",
+        max_requests_per_minute: float = 500,
+        max_tokens_per_minute: float = 200_000,
+        max_attempts: int = 3,
+        cache_dir: str | Path | None = None,
+        max_context_tokens: int = 12000,
+        embedding_model: str | None = None,  # e.g. "all-MiniLM-L6-v2"
+        max_connections: int = 64,
+        request_timeout: float = 120.0,
+        enable_compression: bool = False,
     ):
         if OpenAI is None:
             raise ImportError("The 'openai' library is required. Run: pip install openai")
             
         self.schema = MatrixSchema.from_yaml(schema_path)
+        self._row_model = build_row_model(self.schema.columns)
+        self._response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "MatrixRow",
+                "schema": _strict_json_schema(self._row_model),
+                "strict": True,
+            },
+        }
         
         # Default to local if no key provided
         if not api_key:
@@ -64,69 +356,365 @@ class MatrixAgent:
             if not base_url and "ollama" in api_key:
                 base_url = "http://localhost:11434/v1"
                 
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        # One pooled HTTP client for every call so keep-alive connections are reused
+        self._http = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=request_timeout,
+        )
+        # Transient errors are retried by extract_row alone; SDK retries on top
+        # would multiply every attempt
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self._http,
+            max_retries=0,
+        )
         self.model = model
+        self.provider = base_url or "openai"
+        self.cache = ExtractionCache(cache_dir) if cache_dir else None
+
+        # Throttle to the account's RPM/TPM ceiling instead of bursting into 429s
+        self.max_attempts = max(1, max_attempts)
+        self._request_limiter = TokenBucket(
+            rate=max_requests_per_minute / 60.0,
+            capacity=max(1, int(max_requests_per_minute)),
+        )
+        self._token_limiter = TokenBucket(
+            rate=max_tokens_per_minute / 60.0,
+            capacity=max(1, int(max_tokens_per_minute)),
+        )
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except Exception:
+                self._encoding = None
+
+        # Optional lossy prompt compression, keyed on words from the schema
+        self.enable_compression = enable_compression
+        self._keywords = _schema_keywords(self.schema.columns)
+
+        # The system prompt only depends on the schema, so build and count it once
+        self._system_prompt = self._build_system_prompt()
+        self._system_prompt_tokens = self._count_tokens(self._system_prompt)
+
+        # Embed the schema column descriptions once; chunks are ranked against them
+        self.max_context_tokens = max_context_tokens
+        self.embedder = None
+        self._column_embeddings = None
+        self._cos_sim = None
+        if embedding_model and self.schema.columns:
+            try:
+                from sentence_transformers import SentenceTransformer, util
+
+                self.embedder = SentenceTransformer(embedding_model)
+                self._cos_sim = util.cos_sim
+                self._column_embeddings = self.embedder.encode(
+                    [c.description for c in self.schema.columns],
+                    convert_to_tensor=True,
+                    show_progress_bar=False,
+                )
+            except ImportError:
+                self.embedder = None
+            except Exception as e:
+                print(f"Warning: embedder unavailable ({e}); using full-context fallback")
+                self.embedder = None
+
+        # Schema edits and context-selection changes alter the rows, so they are
+        # part of the cache key (PROMPT_VERSION only covers the prompt template)
+        self._config_hash = ExtractionCache.hash_config(
+            self._system_prompt,
+            enable_compression=enable_compression,
+            max_context_tokens=max_context_tokens,
+            embedding_model=embedding_model if self.embedder is not None else None,
+        )
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self._http.close()
+
+    def __enter__(self) -> "MatrixAgent":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _count_tokens(self, text: str) -> int:
+        """Count prompt tokens (tiktoken if available, else ~4 chars per token)."""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return max(1, len(text) // 4)
+
+    def _wait_for_capacity(self, prompt_tokens: int) -> None:
+        """Block until both the request and token buckets can admit this call."""
+        # A single oversized prompt can never exceed the bucket size, so clamp it
+        tokens = min(prompt_tokens, self._token_limiter.capacity)
+        self._request_limiter.wait_for_token(1)
+        self._token_limiter.wait_for_token(tokens)
 
     def _build_system_prompt(self) -> str:
-        prompt = "You are a precise data extraction assistant for a systematic literature review.\n"
-        prompt += "Your goal is to extract specific fields from a research paper based on the provided text and tables.\n\n"
-        prompt += "SCHEMA (Fields to extract):\n"
+        parts = [
+            "You are a precise data extraction assistant for a systematic literature review.\n",
+            "Your goal is to extract specific fields from a research paper based on the provided text and tables.\n\n",
+            "SCHEMA (Fields to extract):\n",
+        ]
         for col in self.schema.columns:
-            prompt += f"- {col.name} ({col.type}): {col.description}\n"
+            parts.append(f"- {col.name} ({col.type}): {col.description}\n")
         
-        prompt += "\nRULES:\n"
-        prompt += "1. Return the result as a strictly valid JSON object.\n"
-        prompt += "2. If a field is not found, use null.\n"
-        prompt += "3. Checks tables carefully. If a metric is in a table, prefer the table value.\n"
-        prompt += "4. Do not hallucinate. If uncertain, leave null or add a note.\n"
-        return prompt
-
-    def _prepare_context(self, chunks: List[Dict]) -> str:
+        parts.append("\nRULES:\n")
+        parts.append("1. Return the result as a strictly valid JSON object.\n")
+        parts.append("2. If a field is not found, use null.\n")
+        parts.append("3. Checks tables carefully. If a metric is in a table, prefer the table value.\n")
+        parts.append("4. Do not hallucinate. If uncertain, leave null or add a note.\n")
+        return "".join(parts)
+
+    def _format_chunk(self, chunk: Dict) -> str:
+        """Render one chunk's text as a context block."""
+        section = chunk.get("metadata", {}).get("section", "")
+        text = chunk.get("text", "")
+        if self.enable_compression:
+            if section and BOILERPLATE_PATTERN.match(section):
+                return ""
+            text = _compress_chunk(text, self._keywords)
+            if not text:
+                return ""
+        return f"--- Section: {section} ---\n{text}\n\n"
+
+    @staticmethod
+    def _table_page(chunk: Dict) -> Any:
+        """Page whose tables this chunk carries (None if it carries none)."""
+        metadata = chunk.get("metadata", {}) or {}
+        if not metadata.get("tables_on_page"):
+            return None
+        page = metadata.get("page_number")
+        # Without a page number, fall back to the table ids as the grouping key
+        return page if page is not None else tuple(t.get("table_id") for t in metadata["tables_on_page"])
+
+    @staticmethod
+    def _format_page_tables(page: Any, tables: List[Dict]) -> str:
+        """Render a page's tables once; every chunk on that page shares the same list."""
+        table_json = orjson.dumps(tables).decode() if HAS_ORJSON else json.dumps(tables)
+        label = page if isinstance(page, int) else "?"
+        return f"--- Page {label} ---\n[TABLE DATA FOUND]: {table_json}\n\n"
+
+    @staticmethod
+    def _is_high_value(chunk: Dict) -> bool:
+        """Abstracts and chunks sitting next to tables are always worth sending."""
+        metadata = chunk.get("metadata", {}) or {}
+        if metadata.get("tables_on_page") or metadata.get("type") == "table":
+            return True
+        tags = metadata.get("section_tags") or []
+        return "abstract" in tags or metadata.get("section_role") == "abstract"
+
+    def _prepare_context(self, chunks: Iterable[Dict]) -> str:
         """Filter and compress chunks for the context window."""
-        # Heuristic: Focus on Abstract, Introduction, Results, Conclusions
-        # And Chunks with Tables
-        
-        context = ""
-        for chunk in chunks:
-            # We assume small papers for now. For large ones, we'd need RAG retrieval here.
-            # But the user wants to "extract juice", so we dump mostly everything relevant.
-            
-            section = chunk.get("metadata", {}).get("section", "")
-            text = chunk.get("text", "")
-            
-            # Add table data if present (High Value!)
-            tables = chunk.get("metadata", {}).get("tables_on_page", [])
-            table_str = ""
-            if tables:
-                table_str = "\n[TABLE DATA FOUND]: " + json.dumps(tables)
-            
-            context += f"--- Section: {section} ---\n{text}{table_str}\n\n"
-            
-        return context[:50000] # Hard limit characters to avoid blowing up context window (approx 12k tokens)
+        # Each page's tables are emitted once, ahead of that page's first chunk
+        page_tables: dict[Any, str] = {}
+
+        def table_block(chunk: Dict) -> tuple[Any, str]:
+            page = self._table_page(chunk)
+            if page is None:
+                return None, ""
+            if page not in page_tables:
+                page_tables[page] = self._format_page_tables(
+                    page, chunk["metadata"]["tables_on_page"]
+                )
+            return page, page_tables[page]
 
-    def extract_row(self, chunks: List[Dict], paper_id: str) -> Dict:
+        if self.embedder is None:
+            # No embedder: take chunks in order until the hard character limit
+            # (approx 12k tokens); a streamed iterable is not read past that point
+            blocks = []
+            total = 0
+            emitted_pages = set()
+            for chunk in chunks:
+                page, tables_str = table_block(chunk)
+                if page is not None and page not in emitted_pages:
+                    emitted_pages.add(page)
+                    blocks.append(tables_str)
+                    total += len(tables_str)
+                block = self._format_chunk(chunk)
+                blocks.append(block)
+                total += len(block)
+                if total >= MAX_CONTEXT_CHARS:
+                    break
+            return "".join(blocks)[:MAX_CONTEXT_CHARS]
+
+        # Stream the chunks, keeping only their rendered blocks and scores; raw
+        # texts are held for one embedding batch at a time
+        blocks: list[str] = []
+        tables: list[tuple[Any, str]] = []
+        priority: list[int] = []
+        scores: list[float] = []
+        texts: list[str] = []
+
+        def score_batch() -> None:
+            if texts:
+                embeddings = self.embedder.encode(texts, convert_to_tensor=True, show_progress_bar=False)
+                scores.extend(self._cos_sim(embeddings, self._column_embeddings).max(dim=1).values.tolist())
+                texts.clear()
+
+        for i, chunk in enumerate(chunks):
+            blocks.append(self._format_chunk(chunk))
+            tables.append(table_block(chunk))
+            if self._is_high_value(chunk):
+                priority.append(i)
+            texts.append(chunk.get("text", ""))
+            if len(texts) >= EMBED_BATCH_SIZE:
+                score_batch()
+        score_batch()
+        if not blocks:
+            return ""
+
+        # Token-budgeted retrieval: high-value chunks first, then the rest by
+        # relevance to the schema columns until the budget or the score gap is hit
+        priority_set = set(priority)
+        ranked = sorted(
+            (i for i in range(len(blocks)) if i not in priority_set),
+            key=lambda i: scores[i],
+            reverse=True,
+        )
+
+        selected = []
+        selected_pages = set()
+        budget = self.max_context_tokens
+        prev_score = None
+        for i in priority + ranked:
+            is_priority = i in priority_set
+            if not is_priority and prev_score is not None and prev_score - scores[i] > RELEVANCE_SCORE_GAP:
+                # Relevance fell off a cliff; the remaining chunks are noise
+                break
+            page, tables_str = tables[i]
+            tokens = self._count_tokens(blocks[i])
+            if page is not None and page not in selected_pages:
+                tokens += self._count_tokens(tables_str)
+            if tokens > budget:
+                continue
+            selected.append(i)
+            if page is not None:
+                selected_pages.add(page)
+            budget -= tokens
+            if not is_priority:
+                prev_score = scores[i]
+
+        # Keep document order so the model reads a coherent paper
+        parts = []
+        emitted_pages = set()
+        for i in sorted(selected):
+            page, tables_str = tables[i]
+            if page is not None and page not in emitted_pages:
+                emitted_pages.add(page)
+                parts.append(tables_str)
+            parts.append(blocks[i])
+        return "".join(parts)
+
+    def _cached_row(self, paper_id: str, chunks_hash: str) -> tuple[str, Dict | None]:
+        """Cache key for this paper's chunks, and the cached row if it is complete."""
+        cache_key = ExtractionCache.make_key(
+            self.provider,
+            self.model,
+            PROMPT_VERSION,
+            paper_id,
+            chunks_hash,
+            self._config_hash,
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None and all(col.name in cached for col in self.schema.columns):
+            return cache_key, cached
+        return cache_key, None
+
+    def extract_row(self, chunks: Iterable[Dict], paper_id: str) -> Dict:
         """Extract a single row for the matrix from the paper's chunks."""
+        cache_key = None
+        chunks_hash = None
+        if self.cache is not None:
+            if self.embedder is not None:
+                # Embedding reads every chunk anyway, and a cache hit must skip
+                # it: hash first (a one-shot stream is buffered to be read twice)
+                if not isinstance(chunks, Sequence):
+                    chunks = list(chunks)
+                cache_key, cached = self._cached_row(paper_id, ExtractionCache.hash_chunks(chunks))
+                if cached is not None:
+                    return cached
+            else:
+                # Hash chunks as the context builder reads them so a stream is never
+                # materialised; chunks it stops before cannot change the row
+                chunks_hash = hashlib.sha256()
+                chunks = ExtractionCache.iter_hashed(chunks, chunks_hash)
+
         context = self._prepare_context(chunks)
-        system_prompt = self._build_system_prompt()
+
+        if chunks_hash is not None:
+            cache_key, cached = self._cached_row(paper_id, chunks_hash.hexdigest())
+            if cached is not None:
+                return cached
+
+        system_prompt = self._system_prompt
+        user_prompt = f"Extract data for paper ID: {paper_id}\n\nDOCUMENT CONTENT:\n{context}"
+        prompt_tokens = self._system_prompt_tokens + self._count_tokens(user_prompt)
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Extract data for paper ID: {paper_id}\n\nDOCUMENT CONTENT:\n{context}"}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.0
-            )
+            attempt = 0
+            validation_attempt = 0
+            while True:
+                self._wait_for_capacity(prompt_tokens)
+                content = ""
+                try:
+                    # Structured output: the API enforces the row schema
+                    completion = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        response_format=self._response_format,
+                        temperature=0.0
+                    )
+                    message = completion.choices[0].message
+                    if getattr(message, "refusal", None):
+                        raise ValueError(message.refusal)
+                    content = message.content or ""
+                    parsed = self._row_model.model_validate_json(content)
+                    break
+                except ValidationError as e:
+                    if validation_attempt >= MAX_VALIDATION_RETRIES:
+                        raise
+                    validation_attempt += 1
+                    # The model needs to see its own bad output to correct it
+                    feedback = f"Your output had error: {e}. Fix and retry."
+                    messages.append({"role": "assistant", "content": content})
+                    messages.append({"role": "user", "content": feedback})
+                    prompt_tokens += self._count_tokens(content) + self._count_tokens(feedback)
+                except RETRYABLE_ERRORS as e:
+                    if attempt + 1 >= self.max_attempts:
+                        raise
+                    delay = _retry_after_seconds(e)
+                    if delay is None:
+                        # Jitter keeps concurrent workers from retrying in lockstep
+                        delay = RETRY_BASE_DELAY * 2 ** attempt + random.uniform(0, RETRY_BASE_DELAY)
+                    delay = min(delay, RETRY_MAX_DELAY)
+                    attempt += 1
+                    print(f"  Transient error for {paper_id} ({e}), retrying in {delay:.1f}s...")
+                    time.sleep(delay)
             
-            result_json = response.choices[0].message.content
-            data = json.loads(result_json)
+            data = parsed.model_dump(by_alias=True)
             
             # Ensure all schema columns exist
             row = {"Paper ID": paper_id}
             for col in self.schema.columns:
                 row[col.name] = data.get(col.name, None)
+
+            if cache_key is not None:
+                self.cache.put(
+                    cache_key,
+                    row,
+                    {"model": self.model, "ts": time.time(), "prompt_version": PROMPT_VERSION},
+                )
                 
             return row
             
@@ -134,34 +722,73 @@ class MatrixAgent:
             print(f"Error extracting row for {paper_id}: {e}")
             return {"Paper ID": paper_id, "Error": str(e)}
 
+    def _write_matrix(self, rows: Iterable[Dict], output_csv: str | Path):
+        """
+        Write extracted rows to CSV with one column per schema field.
+
+        Rows are written and flushed as they are produced, so a crash midway
+        keeps every finished row and memory stays flat.
+        """
+        output_csv = Path(output_csv)
+        fieldnames = ["Paper ID"] + [c.name for c in self.schema.columns]
+        
+        with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            csvfile.flush()
+            for row in rows:
+                writer.writerow(row)
+                csvfile.flush()
+            
+        print(f"✅ Matrix saved to {output_csv}")
+
+    def _iter_chunk_file_rows(self, chunk_files: List[Path]) -> Iterable[Dict]:
+        """Yield one extracted row per chunks.json file."""
+        for f in chunk_files:
+            print(f"  - Analyzing {f.name}...")
+            paper_id = f.stem.replace("_chunks", "")
+            if ijson is not None:
+                # Stream chunks; the no-embedder context path stops reading at its budget
+                with open(f, 'rb') as cf:
+                    yield self.extract_row(ijson.items(cf, "item", use_float=True), paper_id)
+            else:
+                with open(f, 'rb') as cf:
+                    raw = cf.read()
+                chunks = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+                yield self.extract_row(chunks, paper_id)
+
     def generate_matrix(self, chunks_dir: str | Path, output_csv: str | Path):
         """Process all chunks.json files in a directory and save to CSV."""
         chunks_dir = Path(chunks_dir)
-        output_csv = Path(output_csv)
         
-        rows = []
         chunk_files = list(chunks_dir.glob("*_chunks.json"))
         
         print(f"Processing {len(chunk_files)} papers...")
         
-        for f in chunk_files:
-            print(f"  - Analyzing {f.name}...")
-            with open(f, 'r', encoding='utf-8') as cf:
-                chunks = json.load(cf)
-            
-            paper_id = f.stem.replace("_chunks", "")
-            row = self.extract_row(chunks, paper_id)
-            rows.append(row)
-            
-        # Write to CSV
-        fieldnames = ["Paper ID"] + [c.name for c in self.schema.columns]
+        self._write_matrix(self._iter_chunk_file_rows(chunk_files), output_csv)
+
+    def generate_matrix_from_processed(
+        self,
+        docs: Iterable["ProcessedDocument"],
+        output_csv: str | Path,
+    ):
+        """
+        Build the matrix straight from in-memory pipeline results.
+
+        Skips the chunks.json write/read round trip when the pipeline and the
+        agent run in the same process.
+        """
+        docs = list(docs)
         
-        with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            writer.writerows(rows)
+        print(f"Processing {len(docs)} papers...")
+        
+        def iter_rows():
+            for doc in docs:
+                paper_id = doc.source_path.stem
+                print(f"  - Analyzing {paper_id}...")
+                yield self.extract_row([c.to_dict() for c in doc.chunks], paper_id)
             
-        print(f"✅ Matrix saved to {output_csv}")
+        self._write_matrix(iter_rows(), output_csv)
 
 if __name__ == "__main__":
     # Test stub
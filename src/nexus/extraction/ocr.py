@@ -5,13 +5,28 @@ from __future__ import annotations
 import os
 import shutil
 import subprocess
-import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable
 
 import pymupdf
 
+from nexus.utils.concurrency import env_concurrency
 
+# Optional in-process tesseract bindings (model loads once, no per-page subprocess)
+try:
+    import tesserocr
+    HAS_TESSEROCR = True
+except ImportError:
+    HAS_TESSEROCR = False
+
+# PyTessBaseAPI is not thread-safe, so each OCR thread keeps its own instances
+_TESSEROCR_LOCAL = threading.local()
+
+
+@lru_cache(maxsize=1)
 def _resolve_tesseract_cmd() -> str | None:
     env_path = os.getenv("TESSERACT_PATH")
     if env_path and Path(env_path).exists():
@@ -33,6 +48,7 @@ def _resolve_tesseract_cmd() -> str | None:
     return None
 
 
+@lru_cache(maxsize=4)
 def _resolve_tessdata_dir(cmd_path: str | None) -> str | None:
     env_path = os.getenv("TESSDATA_PREFIX")
     if env_path and Path(env_path).exists():
@@ -55,58 +71,156 @@ def _resolve_tessdata_dir(cmd_path: str | None) -> str | None:
     return None
 
 
+def clear_caches() -> None:
+    """Forget resolved tesseract paths (e.g. after changing TESSERACT_PATH/TESSDATA_PREFIX)."""
+    _resolve_tesseract_cmd.cache_clear()
+    _resolve_tessdata_dir.cache_clear()
+
+
 def tesseract_available() -> bool:
     """Return True if tesseract is available."""
     return _resolve_tesseract_cmd() is not None
 
 
-def _render_page_to_png(page: pymupdf.Page, dpi: int) -> Path:
-    """Render a page to a temporary PNG and return the path."""
-    tmp = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-    tmp_path = Path(tmp.name)
-    tmp.close()
+def _resolve_engine(engine: str) -> str:
+    """Fall back to the tesseract CLI when the tesserocr bindings are not installed."""
+    if engine == "tesserocr" and not HAS_TESSEROCR:
+        return "tesseract"
+    return engine
 
+
+def _render_page_to_pnm(page: pymupdf.Page, dpi: int) -> bytes:
+    """Render a page to uncompressed PNM bytes (read natively by tesseract)."""
     pix = page.get_pixmap(dpi=dpi)
-    pix.save(str(tmp_path))
-    return tmp_path
+    return pix.tobytes("pnm")
+
+
+def _render_page_image(page: pymupdf.Page, dpi: int, engine: str) -> Any:
+    """Render a page in the form the OCR engine consumes."""
+    if engine == "tesserocr":
+        # Raw samples go straight into SetImageBytes, no encoding at all
+        pix = page.get_pixmap(dpi=dpi)
+        return (pix.samples, pix.width, pix.height, pix.n, pix.stride)
+    return _render_page_to_pnm(page, dpi)
+
+
+def _tesserocr_api(lang: str, psm: int = 3) -> "tesserocr.PyTessBaseAPI":
+    """Return this thread's long-lived PyTessBaseAPI for lang, creating it once."""
+    apis = getattr(_TESSEROCR_LOCAL, "apis", None)
+    if apis is None:
+        apis = _TESSEROCR_LOCAL.apis = {}
+    key = (lang, psm)
+    api = apis.get(key)
+    if api is None:
+        tessdata_dir = _resolve_tessdata_dir(_resolve_tesseract_cmd())
+        kwargs = {"lang": lang, "psm": psm}
+        if tessdata_dir:
+            kwargs["path"] = tessdata_dir
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        apis[key] = api
+    return api
+
+
+def _ocr_with_tesserocr(
+    image: tuple,
+    *,
+    lang: str = "eng",
+    psm: int = 3,
+    dpi: int | None = None,
+) -> str:
+    """Run OCR in-process on raw pixmap samples with a reused tesseract model."""
+    samples, width, height, bytes_per_pixel, bytes_per_line = image
+    api = _tesserocr_api(lang, psm)
+    api.SetImageBytes(samples, width, height, bytes_per_pixel, bytes_per_line)
+    if dpi:
+        api.SetSourceResolution(dpi)
+    try:
+        return api.GetUTF8Text()
+    finally:
+        api.Clear()
+
+
+def _tesseract_env(cmd_path: str | None, single_threaded: bool = False) -> dict[str, str]:
+    """Build the environment for tesseract subprocesses."""
+    env = os.environ.copy()
+    if "TESSDATA_PREFIX" not in env:
+        tessdata_dir = _resolve_tessdata_dir(cmd_path)
+        if tessdata_dir:
+            env["TESSDATA_PREFIX"] = tessdata_dir
+    if single_threaded:
+        # Parallel tesseract processes contend on OpenMP threads; one each is faster
+        env.setdefault("OMP_THREAD_LIMIT", "1")
+    return env
 
 
 def _ocr_with_tesseract(
-    image_path: Path,
+    image_data: bytes,
     *,
     lang: str = "eng",
     psm: int = 3,
     oem: int = 1,
     dpi: int | None = None,
     timeout: int = 60,
+    single_threaded: bool = False,
+    cmd_path: str | None = None,
+    env: dict[str, str] | None = None,
 ) -> str:
-    """Run tesseract on a single image and return extracted text."""
-    cmd_path = _resolve_tesseract_cmd()
+    """
+    Run tesseract on an in-memory image (piped via stdin) and return extracted text.
+
+    cmd_path and env may be resolved once by the caller and reused across pages.
+    """
+    if cmd_path is None:
+        cmd_path = _resolve_tesseract_cmd()
     if not cmd_path:
         raise RuntimeError(
             "Tesseract OCR is not installed or not on PATH. "
             "Install it and ensure `tesseract` is available."
         )
 
-    cmd = [cmd_path, str(image_path), "stdout", "-l", lang, "--oem", str(oem), "--psm", str(psm)]
+    cmd = [cmd_path, "-", "stdout", "-l", lang, "--oem", str(oem), "--psm", str(psm)]
     if dpi:
         cmd.extend(["--dpi", str(dpi)])
 
-    env = os.environ.copy()
-    if "TESSDATA_PREFIX" not in env:
-        tessdata_dir = _resolve_tessdata_dir(cmd_path)
-        if tessdata_dir:
-            env["TESSDATA_PREFIX"] = tessdata_dir
+    if env is None:
+        env = _tesseract_env(cmd_path, single_threaded)
 
     result = subprocess.run(
         cmd,
+        input=image_data,
         capture_output=True,
-        text=True,
         check=True,
         timeout=timeout,
         env=env,
     )
-    return result.stdout
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def _ocr_image(
+    image_data: Any,
+    *,
+    engine: str,
+    lang: str,
+    dpi: int,
+    timeout: int,
+    single_threaded: bool = False,
+    cmd_path: str | None = None,
+    env: dict[str, str] | None = None,
+) -> str:
+    """OCR an already-rendered page image."""
+    if engine == "tesserocr":
+        return _ocr_with_tesserocr(image_data, lang=lang, dpi=dpi)
+    if engine == "tesseract":
+        return _ocr_with_tesseract(
+            image_data,
+            lang=lang,
+            dpi=dpi,
+            timeout=timeout,
+            single_threaded=single_threaded,
+            cmd_path=cmd_path,
+            env=env,
+        )
+    raise ValueError(f"Unsupported OCR engine: {engine}")
 
 
 def ocr_page_text(
@@ -117,28 +231,36 @@ def ocr_page_text(
     dpi: int = 300,
     timeout: int = 60,
 ) -> str:
-    """OCR a page to text using the configured engine."""
-    image_path = _render_page_to_png(page, dpi)
-    try:
-        if engine == "tesseract":
-            return _ocr_with_tesseract(image_path, lang=lang, dpi=dpi, timeout=timeout)
-        raise ValueError(f"Unsupported OCR engine: {engine}")
-    finally:
-        try:
-            image_path.unlink()
-        except Exception:
-            pass
+    """
+    OCR a page to text using the configured engine.
+
+    Engines: "tesseract" (CLI subprocess per page) or "tesserocr" (in-process
+    bindings, falling back to the CLI when not installed).
+    """
+    engine = _resolve_engine(engine)
+    image_data = _render_page_image(page, dpi, engine)
+    return _ocr_image(image_data, engine=engine, lang=lang, dpi=dpi, timeout=timeout)
+
+
+def chunk_page_index(chunk: dict, default: int) -> int:
+    """0-based page index of a pymupdf4llm page chunk (default if its metadata has none)."""
+    metadata = chunk.get("metadata") or {}
+    page_number = metadata.get("page_number")
+    if page_number is not None:
+        return page_number - 1  # pymupdf4llm numbers pages from 1
+    return metadata.get("page", default)
 
 
 def detect_ocr_pages(raw_chunks: Iterable[dict], min_chars: int = 200) -> set[int]:
     """Detect pages that should use OCR based on low extracted text volume."""
     pages = set()
     for i, chunk in enumerate(raw_chunks):
-        text = (chunk.get("text") or "").strip()
-        if len(text) < min_chars:
-            metadata = chunk.get("metadata", {}) or {}
-            page_idx = metadata.get("page", i)
-            pages.add(page_idx)
+        text = chunk.get("text") or ""
+        # Stripping only shortens text, so short raw text is already low-volume
+        # and only long raw text needs the (copying) strip to decide
+        if len(text) >= min_chars and len(text.strip()) >= min_chars:
+            continue
+        pages.add(chunk_page_index(chunk, i))
     return pages
 
 
@@ -151,26 +273,99 @@ def apply_ocr_to_chunks(
     lang: str = "eng",
     dpi: int = 300,
     timeout: int = 60,
+    max_workers: int | None = None,
 ) -> list[dict]:
-    """Replace text in raw_chunks for pages flagged for OCR."""
+    """
+    Replace text in raw_chunks for pages flagged for OCR.
+
+    Pages are rendered sequentially (PyMuPDF is not thread-safe), while the
+    OCR engine runs concurrently on up to max_workers threads (default:
+    OCR_CONCURRENCY env var, else CPU count). With tesserocr each thread
+    keeps its own loaded model.
+
+    If the tesseract binary cannot be found, no page is rendered and every
+    flagged chunk is marked with an ocr_error instead.
+    """
+    engine = _resolve_engine(engine)
+    targets = []
     for i, chunk in enumerate(raw_chunks):
         metadata = chunk.get("metadata", {}) or {}
-        page_idx = metadata.get("page", i)
+        page_idx = chunk_page_index(chunk, i)
         if page_idx in ocr_pages:
+            targets.append((chunk, metadata, page_idx))
+        else:
+            metadata["ocr_used"] = False
+        chunk["metadata"] = metadata
+
+    if not targets:
+        return raw_chunks
+
+    # Resolve the binary and environment once, before any page is rendered
+    cmd_path = None
+    if engine == "tesseract":
+        cmd_path = _resolve_tesseract_cmd()
+        if not cmd_path:
+            for _, metadata, _ in targets:
+                metadata["ocr_used"] = False
+                metadata["ocr_error"] = "tesseract unavailable"
+            return raw_chunks
+
+    workers = min(max_workers or env_concurrency("OCR_CONCURRENCY"), len(targets))
+    if workers <= 1:
+        env = _tesseract_env(cmd_path) if cmd_path else None
+        for chunk, metadata, page_idx in targets:
             try:
-                ocr_text = ocr_page_text(
-                    doc[page_idx],
+                image_data = _render_page_image(doc[page_idx], dpi, engine)
+                ocr_text = _ocr_image(
+                    image_data,
                     engine=engine,
                     lang=lang,
                     dpi=dpi,
                     timeout=timeout,
+                    cmd_path=cmd_path,
+                    env=env,
                 )
                 chunk["text"] = ocr_text.strip()
                 metadata["ocr_used"] = True
             except Exception as e:
                 metadata["ocr_used"] = False
                 metadata["ocr_error"] = str(e)
-        else:
-            metadata["ocr_used"] = False
-        chunk["metadata"] = metadata
+        return raw_chunks
+
+    env = _tesseract_env(cmd_path, single_threaded=True) if cmd_path else None
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        in_flight = set()
+        for chunk, metadata, page_idx in targets:
+            # Rendered pages are held in memory until OCR'd; cap the backlog
+            if len(in_flight) >= 2 * workers:
+                _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            try:
+                image_data = _render_page_image(doc[page_idx], dpi, engine)
+            except Exception as e:
+                metadata["ocr_used"] = False
+                metadata["ocr_error"] = str(e)
+                continue
+            future = executor.submit(
+                _ocr_image,
+                image_data,
+                engine=engine,
+                lang=lang,
+                dpi=dpi,
+                timeout=timeout,
+                single_threaded=True,
+                cmd_path=cmd_path,
+                env=env,
+            )
+            pending.append((future, chunk, metadata))
+            in_flight.add(future)
+
+        for future, chunk, metadata in pending:
+            try:
+                chunk["text"] = future.result().strip()
+                metadata["ocr_used"] = True
+            except Exception as e:
+                metadata["ocr_used"] = False
+                metadata["ocr_error"] = str(e)
+
     return raw_chunks
@@ -10,9 +10,18 @@ Combines all phases:
 - Phase 9 (Cartographer): Table extraction and parsing
 """
 
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from dataclasses import dataclass, field
 import json
+import os
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 from .sanitizer import sanitize_pdf, save_sanitized_document, PageChunk
 from .chunker import chunk_pages, chunk_markdown, save_chunks, Chunk
@@ -50,16 +59,17 @@ class ProcessedDocument:
     reference_library: ReferenceLibrary | None = None  # Phase 5: Parsed references
     math_metadata: list[dict] = field(default_factory=list)  # Phase 4: Math extraction info
     table_results: TableExtractionResult | None = None  # Phase 9: Extracted tables
+    _citation_cache: set[int] | None = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def body_page_count(self) -> int:
         """Number of body content pages."""
-        return sum(1 for p in self.pages if not p.metadata.get("is_references", False))
+        return sum(1 for p in self.pages if not p.is_references)
 
     @property
     def reference_page_count(self) -> int:
         """Number of reference pages."""
-        return sum(1 for p in self.pages if p.metadata.get("is_references", False))
+        return sum(1 for p in self.pages if p.is_references)
 
     @property
     def image_count(self) -> int:
@@ -97,11 +107,13 @@ class ProcessedDocument:
 
     @property
     def citation_count(self) -> int:
-        """Number of unique citations found in chunks."""
-        all_citations = set()
-        for chunk in self.chunks:
-            all_citations.update(extract_citation_numbers(chunk.text))
-        return len(all_citations)
+        """Number of unique citations found in chunks (computed once, then cached)."""
+        if self._citation_cache is None:
+            all_citations = set()
+            for chunk in self.chunks:
+                all_citations.update(extract_citation_numbers(chunk.text))
+            self._citation_cache = all_citations
+        return len(self._citation_cache)
 
     @property
     def resolved_citation_count(self) -> int:
@@ -111,6 +123,18 @@ class ProcessedDocument:
         return len(self.reference_library)
 
 
+def _index_chunks_by_page(chunks: list[Chunk]) -> dict[int, list[Chunk]]:
+    """Group non-table chunks by page number in a single pass."""
+    by_page: dict[int, list[Chunk]] = defaultdict(list)
+    for chunk in chunks:
+        if chunk.metadata.get("type") == "table":
+            continue
+        page = chunk.metadata.get("page_number")
+        if page:
+            by_page[page].append(chunk)
+    return by_page
+
+
 def process_pdf_to_chunks(
     pdf_path: str | Path,
     output_dir: str | Path | None = None,
@@ -128,6 +152,10 @@ def process_pdf_to_chunks(
     ocr_dpi: int = 300,
     math_ocr: bool = False,
     math_ocr_engine: str = "pix2tex",
+    math_image_format: str = "png",
+    math_drawing_cache_dir: str | Path | None = None,
+    refresh_math_drawing_cache: bool = False,
+    math_workers: int | None = None,
     inline_math: bool = False,
     merge_table_continuations: bool = True,
     split_references: bool = True,
@@ -159,6 +187,11 @@ def process_pdf_to_chunks(
         ocr_dpi: Render DPI for OCR
         math_ocr: Whether to OCR math regions into LaTeX
         math_ocr_engine: LaTeX OCR engine (pix2tex)
+        math_image_format: Math crop image format ("png", "jpeg" or "webp")
+        math_drawing_cache_dir: Directory caching per-page drawing boxes across runs
+        refresh_math_drawing_cache: Recompute and overwrite cached drawing boxes
+        math_workers: Math scanning/rendering processes (default: MATH_CONCURRENCY
+            env var, else CPU count capped at MAX_MATH_WORKERS)
         inline_math: Whether to append LaTeX blocks to chunk text
         merge_table_continuations: Merge multi-page tables with matching headers
         split_references: Whether to detect and split reference sections
@@ -199,6 +232,10 @@ def process_pdf_to_chunks(
             math_dir,
             ocr_latex=math_ocr,
             latex_ocr_engine=math_ocr_engine,
+            max_workers=math_workers,
+            drawing_cache_dir=math_drawing_cache_dir,
+            refresh_drawing_cache=refresh_math_drawing_cache,
+            image_format=math_image_format,
         )
 
     # Phase 2 & 3: Chunk using appropriate method (with sticky captions)
@@ -215,18 +252,20 @@ def process_pdf_to_chunks(
             source_file=pdf_path.name,
         )
 
+    # Page -> text chunks index, shared by the math and table linking below
+    chunks_by_page = _index_chunks_by_page(chunks)
+
     # Phase 4 Continued: Link math to chunks by page number
     if math_metadata:
         math_by_page = group_math_by_page(math_metadata)
 
         # Attach math metadata to chunks on the same page
-        for chunk in chunks:
-            page = chunk.metadata.get("page_number")
-            if page and page in math_by_page:
-                chunk.metadata["potential_math"] = math_by_page[page]
+        for page, page_math in math_by_page.items():
+            for chunk in chunks_by_page.get(page, ()):
+                chunk.metadata["potential_math"] = page_math
                 if inline_math:
                     latex_blocks = [
-                        m.get("latex") for m in math_by_page[page] if m.get("latex")
+                        m.get("latex") for m in page_math if m.get("latex")
                     ]
                     if latex_blocks:
                         rendered = "\n\n".join(f"\\[{latex}\\]" for latex in latex_blocks)
@@ -259,6 +298,7 @@ def process_pdf_to_chunks(
                 )
                 for c in chunks_with_citations
             ]
+            chunks_by_page = _index_chunks_by_page(chunks)
 
     # Phase 9: Table Extraction (The Cartographer)
     table_results = None
@@ -304,11 +344,9 @@ def process_pdf_to_chunks(
                     })
 
                 # Attach table metadata to text chunks on the same page
-                for chunk in chunks:
-                    if chunk.metadata.get("type") != "table":
-                        page = chunk.metadata.get("page_number")
-                        if page and page in tables_by_page:
-                            chunk.metadata["tables_on_page"] = tables_by_page[page]
+                for page, page_tables in tables_by_page.items():
+                    for chunk in chunks_by_page.get(page, ()):
+                        chunk.metadata["tables_on_page"] = page_tables
 
         except Exception as e:
             print(f"Warning: Table extraction failed: {e}")
@@ -330,10 +368,15 @@ def process_pdf_to_chunks(
             # Save math metadata if we have any
             math_json_path = output_dir / f"{pdf_path.stem}_math.json"
             if math_metadata:
-                math_json_path.write_text(
-                    json.dumps(math_metadata, indent=2),
-                    encoding="utf-8"
-                )
+                if HAS_ORJSON:
+                    math_json_path.write_bytes(
+                        orjson.dumps(math_metadata, option=orjson.OPT_INDENT_2)
+                    )
+                else:
+                    math_json_path.write_text(
+                        json.dumps(math_metadata, indent=2),
+                        encoding="utf-8"
+                    )
             else:
                 if math_json_path.exists():
                     try:
@@ -385,13 +428,20 @@ def process_directory(
     ocr_dpi: int = 300,
     math_ocr: bool = False,
     math_ocr_engine: str = "pix2tex",
+    math_image_format: str = "png",
+    math_drawing_cache_dir: str | Path | None = None,
+    refresh_math_drawing_cache: bool = False,
+    math_workers: int | None = None,
     inline_math: bool = False,
     merge_table_continuations: bool = True,
     split_references: bool = True,
+    max_workers: int | None = None,
 ) -> list[ProcessedDocument]:
     """
     Process all PDFs in a directory.
 
+    PDFs are processed in parallel worker processes (one PDF per task).
+
     Args:
         input_dir: Directory containing PDF files
         output_dir: Directory to save all output files
@@ -408,62 +458,100 @@ def process_directory(
         ocr_dpi: Render DPI for OCR
         math_ocr: Whether to OCR math regions into LaTeX
         math_ocr_engine: LaTeX OCR engine (pix2tex)
+        math_image_format: Math crop image format ("png", "jpeg" or "webp")
+        math_drawing_cache_dir: Directory caching per-page drawing boxes across runs
+        refresh_math_drawing_cache: Recompute and overwrite cached drawing boxes
+        math_workers: Math scanning/rendering processes (default: MATH_CONCURRENCY
+            env var, else CPU count capped at MAX_MATH_WORKERS)
         inline_math: Whether to append LaTeX blocks to chunk text
         merge_table_continuations: Merge multi-page tables with matching headers
         split_references: Whether to detect and split reference sections
+        max_workers: Number of worker processes (default: CPU count, 1 = sequential)
 
     Returns:
-        List of ProcessedDocument results
+        List of ProcessedDocument results, in input file order
     """
     input_dir = Path(input_dir)
     output_dir = Path(output_dir)
 
     pdf_files = list(input_dir.glob("*.pdf"))
-    results = []
-
-    for pdf_path in pdf_files:
-        print(f"Processing: {pdf_path.name}")
-        try:
-            result = process_pdf_to_chunks(
-                pdf_path,
-                output_dir=output_dir,
-                max_chunk_chars=max_chunk_chars,
-                save_intermediate=save_intermediate,
-                extract_images=extract_images,
-                resolve_citations=resolve_citations,
-                extract_math=extract_math,
-                extract_tables=extract_tables,
-                enable_ocr=enable_ocr,
-                ocr_min_chars=ocr_min_chars,
-                ocr_lang=ocr_lang,
-                ocr_engine=ocr_engine,
-                ocr_dpi=ocr_dpi,
-                math_ocr=math_ocr,
-                math_ocr_engine=math_ocr_engine,
-                inline_math=inline_math,
-                merge_table_continuations=merge_table_continuations,
-                split_references=split_references,
-            )
-            results.append(result)
-
-            # Enhanced output with all phase info
-            extras = []
-            if extract_images:
-                extras.append(f"{result.image_count} imgs")
-            if extract_math:
-                extras.append(f"{result.math_count} math")
-            if resolve_citations:
-                extras.append(f"{result.resolved_citation_count} refs")
-            if extract_tables:
-                extras.append(f"{result.table_count} tables")
-
-            extras_str = ", ".join(extras)
-            print(f"  OK: {len(result.chunks)} chunks, {extras_str}")
-
-        except Exception as e:
-            print(f"  ERROR: {e}")
+    options = dict(
+        output_dir=output_dir,
+        max_chunk_chars=max_chunk_chars,
+        save_intermediate=save_intermediate,
+        extract_images=extract_images,
+        resolve_citations=resolve_citations,
+        extract_math=extract_math,
+        extract_tables=extract_tables,
+        enable_ocr=enable_ocr,
+        ocr_min_chars=ocr_min_chars,
+        ocr_lang=ocr_lang,
+        ocr_engine=ocr_engine,
+        ocr_dpi=ocr_dpi,
+        math_ocr=math_ocr,
+        math_ocr_engine=math_ocr_engine,
+        math_image_format=math_image_format,
+        math_drawing_cache_dir=math_drawing_cache_dir,
+        refresh_math_drawing_cache=refresh_math_drawing_cache,
+        math_workers=math_workers,
+        inline_math=inline_math,
+        merge_table_continuations=merge_table_continuations,
+        split_references=split_references,
+    )
 
-    return results
+    def report(result: ProcessedDocument) -> None:
+        # Enhanced output with all phase info
+        extras = []
+        if extract_images:
+            extras.append(f"{result.image_count} imgs")
+        if extract_math:
+            extras.append(f"{result.math_count} math")
+        if resolve_citations:
+            extras.append(f"{result.resolved_citation_count} refs")
+        if extract_tables:
+            extras.append(f"{result.table_count} tables")
+
+        extras_str = ", ".join(extras)
+        print(f"  OK: {len(result.chunks)} chunks, {extras_str}")
+
+    workers = min(max_workers or os.cpu_count() or 1, len(pdf_files))
+    if workers <= 1:
+        results = []
+        for pdf_path in pdf_files:
+            print(f"Processing: {pdf_path.name}")
+            try:
+                result = process_pdf_to_chunks(pdf_path, **options)
+                results.append(result)
+                report(result)
+            except Exception as e:
+                print(f"  ERROR: {e}")
+        return results
+
+    results_by_path: dict[Path, ProcessedDocument] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_directory_worker) as executor:
+        futures = {
+            executor.submit(process_pdf_to_chunks, pdf_path, **options): pdf_path
+            for pdf_path in pdf_files
+        }
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            print(f"Processed: {pdf_path.name}")
+            try:
+                result = future.result()
+                results_by_path[pdf_path] = result
+                report(result)
+            except Exception as e:
+                print(f"  ERROR: {e}")
+
+    return [results_by_path[p] for p in pdf_files if p in results_by_path]
+
+
+def init_directory_worker() -> None:
+    """Keep each worker process single-threaded so N workers don't oversubscribe N cores."""
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    os.environ.setdefault("OCR_CONCURRENCY", "1")
+    os.environ.setdefault("TABLE_CONCURRENCY", "1")
+    os.environ.setdefault("MATH_CONCURRENCY", "1")
 
 
 if __name__ == "__main__":
@@ -10,16 +10,33 @@ Converts a noisy PDF into structured page-based Markdown chunks.
 - [Phase 3] Extracts and filters images (removing icons/logos/junk)
 """
 
+import os
 import re
+import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Iterable
 
 import pymupdf.layout  # Must be imported first to activate layout feature
 import pymupdf4llm
 import pymupdf
 
-from .ocr import apply_ocr_to_chunks, detect_ocr_pages, tesseract_available
+# Optional header-only image size reads (no pixel decode)
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+from .ocr import (
+    HAS_TESSEROCR,
+    apply_ocr_to_chunks,
+    chunk_page_index,
+    detect_ocr_pages,
+    tesseract_available,
+)
 
 
 # Image filtering constants (Phase 3)
@@ -27,9 +44,11 @@ MIN_IMAGE_WIDTH = 200
 MIN_IMAGE_HEIGHT = 200
 MIN_IMAGE_SIZE_KB = 5
 MAX_ASPECT_RATIO = 5.0  # Avoid long thin separator lines
+MAX_IMAGE_WORKERS = 8  # Threads used to inspect extracted images
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
 
 
-@dataclass
+@dataclass(slots=True)
 class PageChunk:
     """A single page's extracted content with metadata."""
     page_number: int
@@ -37,30 +56,60 @@ class PageChunk:
     metadata: dict = field(default_factory=dict)
     images: list[dict] = field(default_factory=list)
     tables: list[dict] = field(default_factory=list)
+    is_references: bool = False  # Page belongs to the references section
 
     @property
     def is_references_page(self) -> bool:
         """Check if this page contains the references section start."""
-        return self.metadata.get("is_references", False)
+        return self.is_references
+
+    @property
+    def has_images(self) -> bool:
+        return bool(self.images)
 
+    @property
+    def has_tables(self) -> bool:
+        return bool(self.tables)
 
-@dataclass
+    @property
+    def image_count(self) -> int:
+        return len(self.images)
+
+    @property
+    def table_count(self) -> int:
+        return len(self.tables)
+
+
+@dataclass(slots=True)
 class SanitizedDocument:
     """Result of sanitizing a PDF document."""
     pages: list[PageChunk]
     source_path: Path
     total_pages: int
     image_dir: Path | None = None  # Phase 3: Directory where images are stored
+    # Body/reference split, computed in one pass on first access
+    _body_pages: list[PageChunk] | None = field(default=None, init=False, repr=False, compare=False)
+    _reference_pages: list[PageChunk] | None = field(default=None, init=False, repr=False, compare=False)
+
+    def _split_pages(self) -> None:
+        body, refs = [], []
+        for p in self.pages:
+            (refs if p.is_references else body).append(p)
+        self._body_pages, self._reference_pages = body, refs
 
     @property
     def body_pages(self) -> list[PageChunk]:
         """Get only body content pages (before references)."""
-        return [p for p in self.pages if not p.metadata.get("is_references", False)]
+        if self._body_pages is None:
+            self._split_pages()
+        return self._body_pages
 
     @property
     def reference_pages(self) -> list[PageChunk]:
         """Get only reference section pages."""
-        return [p for p in self.pages if p.metadata.get("is_references", False)]
+        if self._reference_pages is None:
+            self._split_pages()
+        return self._reference_pages
 
     @property
     def body_text(self) -> str:
@@ -79,7 +128,7 @@ class SanitizedDocument:
 # - **References** (bold only)
 # - ## **References** (header + bold combined)
 # - # **References** (any header level + bold)
-REFERENCE_PATTERNS = [
+REFERENCE_PATTERNS = (
     # Header + Bold combined (e.g., "## **References**")
     r"^#{1,6}\s*\*\*References?\*\*\s*$",
     r"^#{1,6}\s*\*\*Bibliography\*\*\s*$",
@@ -96,74 +145,196 @@ REFERENCE_PATTERNS = [
     # Plain text (e.g., "References")
     r"^References?\s*$",
     r"^Bibliography\s*$",
-]
+)
+
+# All patterns in one regex, compiled once; MULTILINE anchors ^/$ per line so a
+# page is scanned in a single call (leading [ \t]* mirrors the old line.strip()).
+# The shared ^ anchor is factored out and the alternatives are non-capturing,
+# so a match allocates no groups.
+_REFERENCE_RE = re.compile(
+    r"^[ \t]*(?:" + "|".join(p.removeprefix("^") for p in REFERENCE_PATTERNS) + ")",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Size of the page tail searched first for the references heading
+REFERENCE_TAIL_CHARS = 2048
+
+# Standard markdown images: ![alt](path)
+_MD_IMG_RE = re.compile(r'!\[(.*?)\]\((.*?)\)')
+
+# A whole line (plus its newline) holding a markdown image; group 1 is the
+# path of the line's first image, which decides whether the line is kept
+_MD_IMG_LINE_RE = re.compile(r'^.*?!\[.*?\]\((.*?)\).*(?:\n|$)', re.MULTILINE)
 
 
 def detect_references_start(text: str) -> bool:
     """Check if the text contains the start of a references section."""
-    combined_pattern = "|".join(f"({p})" for p in REFERENCE_PATTERNS)
-    for line in text.split("\n"):
-        if re.match(combined_pattern, line.strip(), re.IGNORECASE):
-            return True
-    return False
+    if not text:
+        return False
+    # The references heading usually sits near the bottom of the page where the
+    # section begins: search the tail first, then the rest. The split is at a
+    # line start, so no line is scanned twice or cut in half.
+    if len(text) > REFERENCE_TAIL_CHARS:
+        split = text.rfind("\n", 0, len(text) - REFERENCE_TAIL_CHARS) + 1
+        if split > 0:
+            if _REFERENCE_RE.search(text, split):
+                return True
+            return _REFERENCE_RE.search(text, 0, split) is not None
+    return _REFERENCE_RE.search(text) is not None
 
 
 # =============================================================================
 # Phase 3: Image Filtering Functions
 # =============================================================================
 
-def filter_images(image_dir: Path) -> set[str]:
+def _jpeg_size(f) -> tuple[int, int] | None:
+    """Walk JPEG markers to the first SOFn frame header and read its size."""
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue  # standalone markers carry no length
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        (length,) = struct.unpack(">H", length_bytes)
+        # SOF0..SOF15, excluding DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            h, w = struct.unpack(">HH", frame[1:5])
+            return w, h
+        f.seek(length - 2, 1)
+
+
+def _read_image_size(img_path: str | Path) -> tuple[int, int] | None:
+    """Read (width, height) from an image header; None if it can't be sized."""
+    # One raw open + read syscall pair, no buffered file object
+    fd = os.open(img_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        header = os.read(fd, 24)
+    finally:
+        os.close(fd)
+
+    # Fast path: PNG (what the sanitizer writes) stores its size in the
+    # IHDR chunk, always within the first 24 bytes
+    if header[:8] == PNG_SIGNATURE and header[12:16] == b"IHDR":
+        return struct.unpack(">II", header[16:24])
+    if header[:2] == b"\xff\xd8":
+        with open(img_path, "rb") as f:
+            return _jpeg_size(f)
+
+    if HAS_PIL:
+        # Image.open parses only the header; pixels are never decoded here
+        with Image.open(img_path) as im:
+            return im.size
+    return None
+
+
+def _basename(path_str: str) -> str:
+    """Interned basename via string ops instead of a PurePath (either separator)."""
+    slash = max(path_str.rfind("/"), path_str.rfind("\\"))
+    return sys.intern(path_str[slash + 1:])
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _inspect_one_image(entry: os.DirEntry) -> str | None:
+    """Keep or delete one extracted image; return its filename if kept."""
+    # Filter 1: File size (too small = icon/logo); DirEntry caches the stat
+    try:
+        too_small = entry.stat().st_size < MIN_IMAGE_SIZE_KB * 1024
+    except OSError:
+        return None
+    if too_small:
+        _unlink_quietly(entry.path)
+        return None
+
+    # Filter 2: Dimensions & Aspect Ratio
+    try:
+        size = _read_image_size(entry.path)
+        if size is None:
+            _unlink_quietly(entry.path)
+            return None
+        w, h = size
+
+        # Too small
+        if w < MIN_IMAGE_WIDTH or h < MIN_IMAGE_HEIGHT:
+            _unlink_quietly(entry.path)
+            return None
+
+        # Bad aspect ratio (separator lines, thin decorations)
+        aspect = w / h if h > 0 else 0
+        if aspect > MAX_ASPECT_RATIO or aspect < (1 / MAX_ASPECT_RATIO):
+            _unlink_quietly(entry.path)
+            return None
+
+        # Interned so membership tests in clean_markdown_images hit the pointer-equality fast path
+        return sys.intern(entry.name)
+
+    except Exception:
+        # If we can't read it, delete it
+        _unlink_quietly(entry.path)
+        return None
+
+
+def filter_images(image_dir: Path, referenced: set[str] | None = None) -> set[str]:
     """
     Scan extracted images and delete 'junk' (icons, lines, spacers).
 
+    The directory is listed once with os.scandir (entries carry their file type
+    and cached stat), and images are inspected on a thread pool since the
+    header reads and unlinks release the GIL.
+
+    If referenced is given (basenames linked from the markdown), images nothing
+    links to are deleted without being inspected. This is opt-in: pages whose
+    text was replaced by OCR no longer link their images.
+
     Returns a set of valid filenames to keep in the markdown.
     """
     valid_images = set()
     if not image_dir.exists():
         return valid_images
 
-    for img_path in image_dir.glob("*"):
-        if not img_path.is_file():
-            continue
-
-        # Filter 1: File size (too small = icon/logo)
-        if img_path.stat().st_size < MIN_IMAGE_SIZE_KB * 1024:
-            img_path.unlink()
-            continue
-
-        # Filter 2: Dimensions & Aspect Ratio
-        try:
-            # Use pymupdf to read image dimensions
-            with pymupdf.open(img_path) as img_doc:
-                if len(img_doc) == 0:
-                    img_path.unlink()
-                    continue
-                pix = img_doc[0].get_pixmap()
-                w, h = pix.width, pix.height
-
-                # Too small
-                if w < MIN_IMAGE_WIDTH or h < MIN_IMAGE_HEIGHT:
-                    img_path.unlink()
-                    continue
-
-                # Bad aspect ratio (separator lines, thin decorations)
-                aspect = w / h if h > 0 else 0
-                if aspect > MAX_ASPECT_RATIO or aspect < (1 / MAX_ASPECT_RATIO):
-                    img_path.unlink()
-                    continue
-
-                valid_images.add(img_path.name)
-
-        except Exception:
-            # If we can't read it, delete it
-            try:
-                img_path.unlink()
-            except Exception:
-                pass
+    with os.scandir(image_dir) as it:
+        entries = [entry for entry in it if entry.is_file()]
+
+    if referenced is not None:
+        candidates = []
+        for entry in entries:
+            if entry.name in referenced:
+                candidates.append(entry)
+            else:
+                _unlink_quietly(entry.path)
+        entries = candidates
+
+    workers = min(MAX_IMAGE_WORKERS, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for name in executor.map(_inspect_one_image, entries):
+            if name is not None:
+                valid_images.add(name)
 
     return valid_images
 
 
+def referenced_images(texts: Iterable[str]) -> set[str]:
+    """Basenames of every image linked from the given markdown texts."""
+    return {
+        _basename(path_str)
+        for text in texts
+        for _, path_str in _MD_IMG_RE.findall(text)
+    }
+
+
 def clean_markdown_images(text: str, valid_images: set[str]) -> str:
     """
     Remove markdown image tags for images that were deleted by the filter.
@@ -171,29 +342,28 @@ def clean_markdown_images(text: str, valid_images: set[str]) -> str:
     Input: "Here is text.\n![](images/deleted.png)\nMore text."
     Output: "Here is text.\nMore text."
     """
-    lines = text.split('\n')
-    cleaned_lines = []
+    def keep_or_drop(match: re.Match) -> str:
+        filename = _basename(match.group(1))
+        # Drop the line (it refers to a deleted image)
+        return match.group(0) if filename in valid_images else ""
 
-    # Regex to find standard markdown images: ![alt](path)
-    img_pattern = re.compile(r'!\[(.*?)\]\((.*?)\)')
-
-    for line in lines:
-        match = img_pattern.search(line)
-        if match:
-            path_str = match.group(2)
-            filename = Path(path_str).name
-            if filename not in valid_images:
-                # Skip this line (it refers to a deleted image)
-                continue
-        cleaned_lines.append(line)
-
-    return "\n".join(cleaned_lines)
+    return _MD_IMG_LINE_RE.sub(keep_or_drop, text)
 
 
 # =============================================================================
 # Main Extraction Functions
 # =============================================================================
 
+def _normalize_pages(pages: list[int], page_count: int) -> list[int]:
+    """Sorted, de-duplicated page indices (pymupdf4llm returns pages in document order)."""
+    if not pages:
+        raise ValueError("pages must list at least one page")
+    out_of_range = sorted({p for p in pages if not 0 <= p < page_count})
+    if out_of_range:
+        raise ValueError(f"pages out of range for a {page_count}-page PDF: {out_of_range}")
+    return sorted(set(pages))
+
+
 def sanitize_pdf(
     pdf_path: str | Path,
     image_output_dir: str | Path | None = None,
@@ -203,6 +373,8 @@ def sanitize_pdf(
     ocr_engine: str = "tesseract",
     ocr_dpi: int = 300,
     split_references: bool = True,
+    pages: list[int] | None = None,
+    prune_unlinked_images: bool = False,
 ) -> SanitizedDocument:
     """
     Convert a PDF file to structured page-based Markdown.
@@ -213,6 +385,11 @@ def sanitize_pdf(
     Args:
         pdf_path: Path to the PDF file
         image_output_dir: Optional directory to extract images to
+        pages: Optional 0-based page numbers to extract (default: all pages);
+            skipped pages are never parsed. Pages come back in document order,
+            once each; an empty list or an out-of-range page raises ValueError
+        prune_unlinked_images: Also delete extracted images the markdown never
+            links to (e.g. on OCR-replaced pages) instead of keeping them
 
     Returns:
         SanitizedDocument with structured page chunks
@@ -232,9 +409,13 @@ def sanitize_pdf(
     doc = pymupdf.open(str(pdf_path))
 
     try:
+        if pages is not None:
+            pages = _normalize_pages(pages, doc.page_count)
+
         # Extract with optional image writing
         raw_chunks = pymupdf4llm.to_markdown(
             doc,
+            pages=pages,
             page_chunks=True,
             header=False,
             footer=False,
@@ -245,7 +426,11 @@ def sanitize_pdf(
 
         # Optional OCR for low-text pages
         if enable_ocr:
-            if ocr_engine == "tesseract" and not tesseract_available():
+            # tesserocr falls back to the CLI when its bindings are missing
+            needs_cli = ocr_engine == "tesseract" or (
+                ocr_engine == "tesserocr" and not HAS_TESSEROCR
+            )
+            if needs_cli and not tesseract_available():
                 raise RuntimeError(
                     "OCR is enabled but tesseract is not installed or not on PATH."
                 )
@@ -265,9 +450,13 @@ def sanitize_pdf(
     # Phase 3: Filter junk images
     valid_images = set()
     if write_images and image_output_dir:
-        valid_images = filter_images(image_output_dir)
+        linked = None
+        if prune_unlinked_images:
+            # Only images the markdown links to are worth inspecting
+            linked = referenced_images(chunk.get("text", "") for chunk in raw_chunks)
+        valid_images = filter_images(image_output_dir, referenced=linked)
 
-    pages = []
+    page_chunks = []
     references_started = False
 
     for i, chunk in enumerate(raw_chunks):
@@ -278,37 +467,52 @@ def sanitize_pdf(
             text = clean_markdown_images(text, valid_images)
 
         metadata = chunk.get("metadata", {})
-        page_num = metadata.get("page", i) + 1
+        # With a sparse pages list, the chunk index is not the page index
+        page_num = chunk_page_index(chunk, pages[i] if pages else i) + 1
         images = chunk.get("images", [])
         tables = chunk.get("tables", [])
 
-        if split_references and (not references_started) and detect_references_start(text):
+        # Once the references start, every later page is references; stop scanning
+        if split_references and not references_started and detect_references_start(text):
             references_started = True
 
+        is_references = references_started if split_references else False
+        # Downstream JSON consumers read these keys; update the page's own
+        # metadata dict in place rather than copying it
+        metadata.update(
+            is_references=is_references,
+            has_images=len(images) > 0,
+            has_tables=len(tables) > 0,
+            image_count=len(images),
+            table_count=len(tables),
+        )
         page_chunk = PageChunk(
             page_number=page_num,
             text=text.strip(),
-            metadata={
-                **metadata,
-                "is_references": references_started if split_references else False,
-                "has_images": len(images) > 0,
-                "has_tables": len(tables) > 0,
-                "image_count": len(images),
-                "table_count": len(tables),
-            },
+            metadata=metadata,
             images=images,
             tables=tables,
+            is_references=is_references,
         )
-        pages.append(page_chunk)
+        page_chunks.append(page_chunk)
 
     return SanitizedDocument(
-        pages=pages,
+        pages=page_chunks,
         source_path=pdf_path,
-        total_pages=len(pages),
+        total_pages=len(page_chunks),
         image_dir=image_output_dir if write_images else None,
     )
 
 
+def _write_pages(path: Path, pages: list[PageChunk]) -> None:
+    """Write page texts joined by blank lines, page by page (no combined string)."""
+    with path.open("w", encoding="utf-8") as f:
+        for i, page in enumerate(pages):
+            if i:
+                f.write("\n\n")
+            f.write(page.text)
+
+
 def save_sanitized_document(
     doc: SanitizedDocument,
     output_dir: str | Path,
@@ -319,11 +523,12 @@ def save_sanitized_document(
 
     base_name = doc.source_path.stem
     body_path = output_dir / f"{base_name}_body.md"
-    body_path.write_text(doc.body_text, encoding="utf-8")
+    _write_pages(body_path, doc.body_pages)
     references_path = None
-    if doc.references.strip():
+    reference_pages = doc.reference_pages
+    if any(p.text.strip() for p in reference_pages):
         references_path = output_dir / f"{base_name}_references.md"
-        references_path.write_text(doc.references, encoding="utf-8")
+        _write_pages(references_path, reference_pages)
     else:
         stale_ref = output_dir / f"{base_name}_references.md"
         if stale_ref.exists():
@@ -368,8 +573,6 @@ def process_pdf(
 
 
 if __name__ == "__main__":
-    import sys
-
     if len(sys.argv) < 2:
         print("Usage: python sanitizer.py <pdf_path> [output_dir]")
         sys.exit(1)
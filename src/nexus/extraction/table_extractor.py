@@ -40,20 +40,38 @@ TODO / Future Improvements:
 
 import json
 import csv
+import hashlib
 import io
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, repeat
 from pathlib import Path
-from dataclasses import dataclass, field, asdict
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Iterator
 
 import pymupdf
 
+from nexus.utils.concurrency import env_concurrency
+
 # Optional fuzzy matching for header similarity
 try:
     from rapidfuzz import fuzz
     HAS_RAPIDFUZZ = True
 except Exception:
     HAS_RAPIDFUZZ = False
+# Optional fast JSON encoder for table exports
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+# Optional vectorized byte counting for long pages
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 # Try to import pymupdf4llm for enhanced extraction
 try:
     import pymupdf4llm
@@ -61,8 +79,27 @@ try:
 except ImportError:
     HAS_PYMUPDF4LLM = False
 
-
-@dataclass
+# Compiled once; these run on every page / every table
+# Caption line: "Table 3: ...", "TABLE 3. ...", "Tab. 3: ..."
+_CAPTION_RE = re.compile(r"^(?:Table\s+|Tab\.\s*)\d+[.:]\s*(.+)$", re.IGNORECASE)
+# Any table reference on a page: "Table 1", "TABLE IV", "Tab. 2"
+_TABLE_SCAN_RE = re.compile(r"Tab(?:le\s+(?:\d+|[IVX]+)|\.\s*\d+)", re.IGNORECASE)
+# Caption fragment mixed into a header row
+_FRAGMENT_RE = re.compile(r"^Table\s*\d+[\s.:]+(.+)$", re.IGNORECASE)
+# Markdown line mentioning a table number (caption candidate)
+_TABLE_LINE_RE = re.compile(r"Table\s*\d+", re.IGNORECASE)
+# Table number in a caption, for continuation matching
+_TABLE_NUMBER_RE = re.compile(r"Table\s+([IVX]+|\d+)", re.IGNORECASE)
+_NON_WORD_RE = re.compile(r"\W+")
+_WS_RE = re.compile(r"\s+")
+# Markdown cell escaping: newlines flatten, pipes are escaped
+_MD_CELL_ESCAPE = str.maketrans({"\n": " ", "|": "\\|"})
+ASCII_DIGITS = "0123456789"
+# Below this many chars, numpy's per-call overhead outweighs the str.count scans
+NUMPY_SCAN_MIN_CHARS = 8192
+
+
+@dataclass(slots=True)
 class TableCell:
     """A single cell in a table."""
     text: str
@@ -73,10 +110,18 @@ class TableCell:
     is_header: bool = False
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Literal dict: asdict() recurses and deep-copies field by field
+        return {
+            "text": self.text,
+            "row": self.row,
+            "col": self.col,
+            "row_span": self.row_span,
+            "col_span": self.col_span,
+            "is_header": self.is_header,
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractedTable:
     """A table extracted from a PDF page."""
     table_id: str
@@ -88,6 +133,8 @@ class ExtractedTable:
     bbox: tuple[float, float, float, float]  # (x0, y0, x1, y1)
     caption: str = ""
     source_file: str = ""
+    # Non-empty cell fraction, memoized by post_process_table / strategy scoring
+    _density: float | None = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> dict:
         return {
@@ -104,7 +151,10 @@ class ExtractedTable:
 
     def to_markdown(self) -> str:
         """Convert table to Markdown format."""
-        if not self.rows and not self.headers:
+        # Widest row decides the column count (no headers + rows copy)
+        col_count = max(len(self.headers), max((len(row) for row in self.rows), default=0))
+        if col_count == 0:
+            # No cells at all (no rows, or only empty ones): nothing to render
             return ""
 
         lines = []
@@ -113,28 +163,21 @@ class ExtractedTable:
         if self.caption:
             lines.append(f"**{self.caption}**\n")
 
-        # Determine column widths for better formatting
-        all_rows = [self.headers] + self.rows if self.headers else self.rows
-        if not all_rows:
-            return ""
-
-        col_count = max(len(row) for row in all_rows)
+        sep_row = "| " + " | ".join(["---"] * col_count) + " |"
 
         # Headers
         if self.headers:
             header_row = self.headers + [""] * (col_count - len(self.headers))
             lines.append("| " + " | ".join(str(h) for h in header_row) + " |")
-            lines.append("| " + " | ".join(["---"] * col_count) + " |")
-        else:
-            # No headers, create a separator anyway
-            lines.append("| " + " | ".join(["---"] * col_count) + " |")
+        # Separator (also emitted without headers)
+        lines.append(sep_row)
 
-        # Data rows
+        # Data rows, cleaned in one translate pass (newlines, pipes)
         for row in self.rows:
-            padded_row = list(row) + [""] * (col_count - len(row))
-            # Clean cell content (replace newlines, pipes)
-            cleaned = [str(cell).replace("\n", " ").replace("|", "\\|") for cell in padded_row]
-            lines.append("| " + " | ".join(cleaned) + " |")
+            padding = [""] * (col_count - len(row))
+            lines.append(
+                "| " + " | ".join([str(cell).translate(_MD_CELL_ESCAPE) for cell in row] + padding) + " |"
+            )
 
         return "\n".join(lines)
 
@@ -146,8 +189,8 @@ class ExtractedTable:
         if self.headers:
             writer.writerow(self.headers)
 
-        for row in self.rows:
-            writer.writerow(row)
+        # One call; the per-row loop runs inside the C csv writer
+        writer.writerows(self.rows)
 
         return output.getvalue()
 
@@ -175,9 +218,12 @@ class ExtractedTable:
         if self.headers:
             lines.append("Headers: " + ", ".join(str(h) for h in self.headers))
 
+        # Column labels resolved once: header text, else "ColN" past the headers
+        max_cols = max((len(row) for row in self.rows), default=0)
+        labels = self.headers[:max_cols] + [f"Col{j+1}" for j in range(len(self.headers), max_cols)]
+
         for i, row in enumerate(self.rows):
-            row_text = ", ".join(f"{self.headers[j] if self.headers and j < len(self.headers) else f'Col{j+1}'}: {cell}"
-                                  for j, cell in enumerate(row))
+            row_text = ", ".join(f"{label}: {cell}" for label, cell in zip(labels, row))
             lines.append(f"Row {i+1}: {row_text}")
 
         return "\n".join(lines)
@@ -216,46 +262,49 @@ class TableExtractionResult:
 
 def generate_table_id(page_number: int, table_index: int, source_file: str) -> str:
     """Generate a unique table ID."""
-    import hashlib
     hash_input = f"{source_file}:p{page_number}:t{table_index}"
-    return hashlib.sha256(hash_input.encode()).hexdigest()[:12]
+    # First 6 bytes as hex == hexdigest()[:12], without the full 64-char string
+    return hashlib.sha256(hash_input.encode()).digest()[:6].hex()
 
 
-def find_table_caption(page: pymupdf.Page, table_bbox: tuple, direction: str = "above") -> str:
+def find_table_caption(
+    page: pymupdf.Page,
+    table_bbox: tuple,
+    direction: str = "above",
+    page_dict: dict | None = None,
+) -> str:
     """
     Try to find a caption for the table by looking above or below it.
 
-    Captions typically start with "Table X" or "TABLE X".
+    Captions typically start with "Table X" or "TABLE X". With a pre-extracted
+    page_dict, text lines intersecting the search area are looked up there
+    (whole lines) instead of re-parsing the area with a clipped get_text.
     """
-    import re
-
     x0, y0, x1, y1 = table_bbox
     page_height = page.rect.height
 
-    # Define search area
+    # Define search area as a plain (x0, y0, x1, y1) tuple; clip= accepts it as-is
     if direction == "above":
         # Look 50 points above the table
-        search_rect = pymupdf.Rect(x0 - 20, max(0, y0 - 60), x1 + 20, y0)
+        search_rect = (x0 - 20, max(0, y0 - 60), x1 + 20, y0)
     else:
         # Look 50 points below the table
-        search_rect = pymupdf.Rect(x0 - 20, y1, x1 + 20, min(page_height, y1 + 60))
+        search_rect = (x0 - 20, y1, x1 + 20, min(page_height, y1 + 60))
 
     # Extract text from the search area
-    text = page.get_text("text", clip=search_rect).strip()
+    if page_dict is not None:
+        text = "\n".join(
+            "".join(span["text"] for span in line["spans"])
+            for line in _lines_in_rect(page_dict, search_rect)
+        ).strip()
+    else:
+        text = page.get_text("text", clip=search_rect).strip()
 
     # Look for table caption patterns
-    caption_patterns = [
-        r"^Table\s+\d+[.:]\s*(.+)$",
-        r"^TABLE\s+\d+[.:]\s*(.+)$",
-        r"^Tab\.\s*\d+[.:]\s*(.+)$",
-    ]
-
     for line in text.split("\n"):
         line = line.strip()
-        for pattern in caption_patterns:
-            match = re.match(pattern, line, re.IGNORECASE)
-            if match:
-                return line  # Return the full caption line
+        if _CAPTION_RE.match(line):
+            return line  # Return the full caption line
 
     # If no pattern match, check if any line starts with "Table"
     for line in text.split("\n"):
@@ -269,16 +318,26 @@ def find_table_caption(page: pymupdf.Page, table_bbox: tuple, direction: str = "
 # Table detection strategies in order of preference
 TABLE_STRATEGIES = ["lines_strict", "lines", "text"]
 
+# A lines_strict result this dense is accepted without trying other strategies
+CONFIDENT_DENSITY = 0.8
 
+# Below this many pages, process pool startup costs more than it saves
+PARALLEL_MIN_PAGES = 4
+PAGE_CHUNKS_PER_WORKER = 8  # Page runs per worker, for load balancing
+
+
+@lru_cache(maxsize=8192)
 def clean_cell_text(text: str) -> str:
-    """Clean cell text by removing special unicode characters and normalizing whitespace."""
+    """
+    Clean cell text by removing special unicode characters and normalizing whitespace.
+
+    Cached: cell values repeat heavily within a document (units, "N/A", "-")
+    and every find_tables strategy re-cleans the same cells.
+    """
     if not text:
         return ""
-    # Replace narrow no-break space and other special whitespace
-    text = text.replace('\u202f', ' ').replace('\u00a0', ' ')
-    # Normalize whitespace
-    text = ' '.join(text.split())
-    return text.strip()
+    # \s is Unicode-aware, so narrow/regular no-break spaces collapse too
+    return _WS_RE.sub(' ', text).strip()
 
 
 def merge_fragmented_headers(headers: list[str]) -> list[str]:
@@ -295,8 +354,7 @@ def merge_fragmented_headers(headers: list[str]) -> list[str]:
     combined = ' '.join(h for h in headers if h)
 
     # If the combined text starts with "Table X", it's likely a caption that got mixed in
-    import re
-    table_match = re.match(r'^Table\s*\d+[\s.:]+(.+)$', combined, re.IGNORECASE)
+    table_match = _FRAGMENT_RE.match(combined)
     if table_match:
         # Return the actual header content without "Table X" prefix
         actual_content = table_match.group(1).strip()
@@ -346,24 +404,78 @@ def remove_empty_rows_and_cols(rows: list[list[str]], headers: list[str]) -> tup
     return new_rows, headers
 
 
+def _count_non_empty(cells) -> int:
+    """Number of cells that aren't blank (strip/bool mapped at C level, no Python loop body)."""
+    return sum(map(bool, map(str.strip, cells)))
+
+
 def is_table_too_sparse(rows: list[list[str]], headers: list[str], threshold: float = 0.7) -> bool:
     """Check if table has too many empty cells (likely a detection error)."""
     if not rows:
         return True
 
+    cells = list(chain.from_iterable(rows))
+    total_cells = len(cells)
+    if total_cells == 0:
+        return True
+
+    empty_cells = total_cells - _count_non_empty(cells)
+    return (empty_cells / total_cells) > threshold
+
+
+def _normalize_and_score(
+    headers: list[str], rows: list[list[str]]
+) -> tuple[list[str], list[list[str]], float, float]:
+    """
+    Strip each cell once for sparsity, empty row/col removal and density.
+
+    Equivalent to is_table_too_sparse + remove_empty_rows_and_cols followed
+    by the strategy density, fused into a single pass over the cell grid.
+
+    Returns:
+        (headers, rows, empty_fraction, density): the input's empty-cell
+        fraction over data rows, and the non-empty fraction of the result
+        with the header row included
+    """
+    col_count = len(headers) if headers else max((len(r) for r in rows), default=0)
+    if not rows or col_count == 0:
+        cells = (len(rows) + (1 if headers else 0)) * col_count
+        density = _count_non_empty(headers) / cells if cells > 0 else 0
+        return headers, rows, 1.0, density
+
+    header_mask = [bool(h.strip()) for h in headers]
+    col_has_content = header_mask + [False] * (col_count - len(header_mask))
+    row_masks = []
     total_cells = 0
     empty_cells = 0
 
     for row in rows:
-        for cell in row:
-            total_cells += 1
-            if not cell.strip():
-                empty_cells += 1
+        mask = list(map(bool, map(str.strip, row)))
+        row_masks.append(mask)
+        total_cells += len(mask)
+        empty_cells += len(mask) - sum(mask)
+        for col_idx, filled in enumerate(mask[:col_count]):
+            if filled:
+                col_has_content[col_idx] = True
+
+    keep = [i for i, has_content in enumerate(col_has_content) if has_content]
+    if headers:
+        headers = [headers[i] for i in keep]
+    non_empty = sum(header_mask[i] for i in keep) if headers else 0
 
-    if total_cells == 0:
-        return True
+    new_rows = []
+    for row, mask in zip(rows, row_masks):
+        n = len(row)
+        filled = sum(mask[i] for i in keep if i < n)
+        # Only add row if it has some content
+        if filled:
+            new_rows.append([row[i] if i < n else "" for i in keep])
+            non_empty += filled
 
-    return (empty_cells / total_cells) > threshold
+    empty_fraction = empty_cells / total_cells if total_cells else 1.0
+    cells = (len(new_rows) + (1 if headers else 0)) * (len(keep) if headers or new_rows else 0)
+    density = non_empty / cells if cells > 0 else 0
+    return headers, new_rows, empty_fraction, density
 
 
 def post_process_table(table: ExtractedTable) -> ExtractedTable | None:
@@ -371,24 +483,24 @@ def post_process_table(table: ExtractedTable) -> ExtractedTable | None:
     Post-process a table to clean up common extraction issues.
     Returns None if the table should be discarded.
     """
+    # Clean up headers
+    headers = merge_fragmented_headers(table.headers)
+
+    # Remove empty rows and columns (one pass also yields sparsity and density)
+    headers, rows, empty_fraction, density = _normalize_and_score(headers, table.rows)
+
     # Skip tables that are too sparse
-    if is_table_too_sparse(table.rows, table.headers, threshold=0.8):
+    if not table.rows or empty_fraction > 0.8:
         # Only skip if table is very large (likely a detection error)
         if table.row_count > 10 or table.col_count > 10:
             return None
 
-    # Clean up headers
-    headers = merge_fragmented_headers(table.headers)
-
-    # Remove empty rows and columns
-    rows, headers = remove_empty_rows_and_cols(table.rows, headers)
-
     # Skip if table is now empty
     if not rows and not headers:
         return None
 
     # Create updated table
-    return ExtractedTable(
+    processed = ExtractedTable(
         table_id=table.table_id,
         page_number=table.page_number,
         row_count=len(rows),
@@ -399,6 +511,8 @@ def post_process_table(table: ExtractedTable) -> ExtractedTable | None:
         caption=table.caption,
         source_file=table.source_file,
     )
+    processed._density = density
+    return processed
 
 
 def parse_markdown_table(markdown_lines: list[str]) -> tuple[list[str], list[list[str]]]:
@@ -440,6 +554,25 @@ def parse_markdown_table(markdown_lines: list[str]) -> tuple[list[str], list[lis
     return headers, rows
 
 
+def _iter_markdown_table_blocks(lines: list[str]) -> Iterator[tuple[int, list[str]]]:
+    """Yield (start line index, lines) for each run of consecutive '|' lines."""
+    current_block = []
+    block_start = 0
+
+    for idx, line in enumerate(lines):
+        if '|' in line and line.lstrip().startswith('|'):
+            if not current_block:
+                block_start = idx
+            current_block.append(line)
+        elif current_block:
+            if len(current_block) >= 2:  # At least header + separator
+                yield block_start, current_block
+            current_block = []
+
+    if len(current_block) >= 2:
+        yield block_start, current_block
+
+
 def extract_tables_from_markdown(
     doc: pymupdf.Document,
     page_number: int,
@@ -468,25 +601,13 @@ def extract_tables_from_markdown(
             return []
 
         text = result[0].get('text', '')
+        # Most pages have no table at all; one C-level scan skips the line loop
+        if '|' not in text:
+            return []
         lines = text.split('\n')
 
-        # Find table blocks (consecutive lines with |)
-        table_blocks = []
-        current_block = []
-
-        for line in lines:
-            if '|' in line and line.strip().startswith('|'):
-                current_block.append(line)
-            elif current_block:
-                if len(current_block) >= 2:  # At least header + separator
-                    table_blocks.append(current_block)
-                current_block = []
-
-        if current_block and len(current_block) >= 2:
-            table_blocks.append(current_block)
-
-        # Parse each table block
-        for i, block in enumerate(table_blocks):
+        # Parse each table block as the scan closes it
+        for i, (block_start_idx, block) in enumerate(_iter_markdown_table_blocks(lines)):
             headers, rows = parse_markdown_table(block)
 
             if not headers and not rows:
@@ -494,10 +615,9 @@ def extract_tables_from_markdown(
 
             # Try to find caption (look for "Table X" pattern before the table)
             caption = ""
-            block_start_idx = lines.index(block[0]) if block[0] in lines else -1
             if block_start_idx > 0:
                 for j in range(block_start_idx - 1, max(0, block_start_idx - 5), -1):
-                    if re.match(r'.*Table\s*\d+', lines[j], re.IGNORECASE):
+                    if _TABLE_LINE_RE.search(lines[j]):
                         caption = clean_cell_text(lines[j])
                         break
 
@@ -523,13 +643,36 @@ def extract_tables_from_markdown(
     return tables
 
 
-def detect_rotated_headers(page: pymupdf.Page, table_bbox: tuple) -> bool:
+def _page_text_dict(page: pymupdf.Page) -> dict:
+    """Extract the page's text dict once (no image payloads) for bbox look-ups."""
+    return page.get_text("dict", flags=pymupdf.TEXTFLAGS_DICT & ~pymupdf.TEXT_PRESERVE_IMAGES)
+
+
+def _lines_in_rect(page_dict: dict, rect: tuple) -> list[dict]:
+    """Text lines of a page dict whose bbox intersects rect (x0, y0, x1, y1)."""
+    rx0, ry0, rx1, ry1 = rect
+    lines = []
+    for block in page_dict.get("blocks", []):
+        for line in block.get("lines", []):
+            lx0, ly0, lx1, ly1 = line["bbox"]
+            if lx0 < rx1 and rx0 < lx1 and ly0 < ry1 and ry0 < ly1:
+                lines.append(line)
+    return lines
+
+
+def detect_rotated_headers(
+    page: pymupdf.Page,
+    table_bbox: tuple,
+    page_dict: dict | None = None,
+) -> bool:
     """
     Check if the table header area contains rotated text (vertical text).
 
     Args:
         page: PyMuPDF Page object
         table_bbox: Bounding box of the table (x0, y0, x1, y1)
+        page_dict: Optional pre-extracted page.get_text("dict") to look
+            lines up in, instead of re-parsing the header area
 
     Returns:
         True if rotated text is detected in the header area
@@ -537,25 +680,31 @@ def detect_rotated_headers(page: pymupdf.Page, table_bbox: tuple) -> bool:
     x0, y0, x1, y1 = table_bbox
     # Define header area (approx top 20% or top 50pt of table)
     header_height = min((y1 - y0) * 0.2, 80)
-    header_rect = pymupdf.Rect(x0, y0, x1, y0 + header_height)
 
-    # Get text dict in header area
-    try:
-        text_dict = page.get_text("dict", clip=header_rect)
-    except Exception:
-        return False
+    if page_dict is not None:
+        header_lines = _lines_in_rect(page_dict, (x0, y0, x1, y0 + header_height))
+    else:
+        header_rect = (x0, y0, x1, y0 + header_height)
 
-    for block in text_dict.get("blocks", []):
-        for line in block.get("lines", []):
-            # Check for non-horizontal text
-            # dir=(1, 0) is horizontal. (0, -1) or (0, 1) is vertical
-            if abs(line["dir"][1]) > 0.1:  # Significant vertical component
+        # Get text dict in header area
+        try:
+            text_dict = page.get_text("dict", clip=header_rect)
+        except Exception:
+            return False
+        header_lines = [
+            line for block in text_dict.get("blocks", []) for line in block.get("lines", [])
+        ]
+
+    for line in header_lines:
+        # Check for non-horizontal text
+        # dir=(1, 0) is horizontal. (0, -1) or (0, 1) is vertical
+        if abs(line["dir"][1]) > 0.1:  # Significant vertical component
+            return True
+        # Also check char-level rotation for some PDFs
+        for span in line["spans"]:
+            # If individual chars are rotated
+            if span.get("rotation", 0) != 0:
                 return True
-            # Also check char-level rotation for some PDFs
-            for span in line["spans"]:
-                # If individual chars are rotated
-                if span.get("rotation", 0) != 0:
-                    return True
 
     return False
 
@@ -566,6 +715,7 @@ def extract_tables_from_page_with_strategy(
     source_file: str = "",
     find_captions: bool = True,
     strategy: str = "lines_strict",
+    page_dict: dict | None = None,
 ) -> list[ExtractedTable]:
     """
     Extract tables from a page using a specific strategy.
@@ -576,6 +726,7 @@ def extract_tables_from_page_with_strategy(
         source_file: Name of the source PDF file
         find_captions: Whether to search for table captions
         strategy: Table detection strategy ("lines_strict", "lines", "text")
+        page_dict: Optional pre-extracted page text dict, shared across strategies
 
     Returns:
         List of ExtractedTable objects
@@ -591,7 +742,7 @@ def extract_tables_from_page_with_strategy(
     for i, table in enumerate(table_finder.tables):
         try:
             # Check for rotated headers (feature B in improvement plan)
-            has_rotated_headers = detect_rotated_headers(page, tuple(table.bbox))
+            has_rotated_headers = detect_rotated_headers(page, tuple(table.bbox), page_dict)
             
             # Get raw table data
             table_data = table.extract()
@@ -624,9 +775,9 @@ def extract_tables_from_page_with_strategy(
             # Find caption
             caption = ""
             if find_captions:
-                caption = find_table_caption(page, bbox, "above")
+                caption = find_table_caption(page, bbox, "above", page_dict)
                 if not caption:
-                    caption = find_table_caption(page, bbox, "below")
+                    caption = find_table_caption(page, bbox, "below", page_dict)
                 caption = clean_cell_text(caption)
                 
             # If rotated headers detected, mark in caption or metadata
@@ -660,25 +811,45 @@ def extract_tables_from_page_with_strategy(
     return tables
 
 
-def should_scan_for_tables(page: pymupdf.Page) -> bool:
+def _count_ascii_digits(text: str) -> int:
+    """Count ASCII digits, vectorized over the UTF-8 bytes for long texts."""
+    if HAS_NUMPY and len(text) >= NUMPY_SCAN_MIN_CHARS:
+        # UTF-8 never uses 0x30-0x39 inside multi-byte sequences, so byte
+        # counts equal character counts for ASCII digits
+        buf = np.frombuffer(text.encode("utf-8", "surrogatepass"), dtype=np.uint8)
+        return int(np.count_nonzero((buf >= 0x30) & (buf <= 0x39)))
+    return sum(map(text.count, ASCII_DIGITS))
+
+
+def should_scan_for_tables(page: pymupdf.Page, text: str | None = None) -> bool:
     """
     Heuristic check to decide if we should run the expensive table finder on this page.
     Returns True if the page likely contains a table.
+
+    Pass text if the page's plain text was already extracted.
     """
     try:
         # 1. Text Search (Fastest)
-        text = page.get_text("text")  
+        if text is None:
+            text = page.get_text("text")
         
         # Check for explicit keywords (capture Table 1, TABLE I, etc.)
-        if re.search(r"Table\s+\d+|TABLE\s+\d+|Tab\.\s*\d+|Table\s+[IVX]+", text, re.IGNORECASE):
+        # Substring pre-checks are plain C scans and reject most pages before
+        # the regex runs ("Table"/"TABLE" contain able/ABLE, "Tab."/"TAB." ab./AB.)
+        if (
+            "able" in text or "ABLE" in text or "ab." in text or "AB." in text
+        ) and _TABLE_SCAN_RE.search(text):
             return True
             
         # 2. Structure Density Check
-        # Tables have high numeric density
-        digits = sum(c.isdigit() for c in text)
-        non_space = sum(1 for c in text if not c.isspace())
+        # Tables have high numeric density. Count with C-level str ops rather
+        # than a per-character Python loop: split() drops all whitespace, and
+        # one count() per ASCII digit
+        # Non-space chars can't exceed len(text), so short pages skip the split
+        non_space = len("".join(text.split())) if len(text) > 100 else 0
         
         if non_space > 100:  # Avoid empty pages
+            digits = _count_ascii_digits(text)
             digit_ratio = digits / non_space
             # If > 10% of chars are digits, it might be a data-heavy table without a standard caption
             if digit_ratio > 0.10:  
@@ -691,6 +862,38 @@ def should_scan_for_tables(page: pymupdf.Page) -> bool:
     return False
 
 
+def _table_cells_and_density(table: ExtractedTable) -> tuple[int, float]:
+    """Total cell count (header row included) and fraction of non-empty cells."""
+    cells = (table.row_count + (1 if table.headers else 0)) * table.col_count
+    if table._density is not None:
+        return cells, table._density
+    non_empty = _count_non_empty(chain(table.headers, chain.from_iterable(table.rows)))
+    density = non_empty / cells if cells > 0 else 0
+    # Memoize so re-scoring the same table never re-strips its cells
+    table._density = density
+    return cells, density
+
+
+def _score_tables(tables: list[ExtractedTable]) -> tuple[float, bool]:
+    """
+    Score a strategy's tables as sum(cells * density^2).
+
+    Also reports whether the result is confident: every table is dense
+    (> CONFIDENT_DENSITY) with at least two data rows.
+    """
+    if not tables:
+        return 0, False
+    score = 0
+    confident = True
+    for t in tables:
+        cells, density = _table_cells_and_density(t)
+        # Reward larger tables, but heavily penalize sparse ones (likely garbage)
+        score += cells * (density ** 2)  # Square density to punish sparsity more
+        if density <= CONFIDENT_DENSITY or t.row_count < 2:
+            confident = False
+    return score, confident
+
+
 def extract_tables_from_page(
     page: pymupdf.Page,
     page_number: int,
@@ -716,16 +919,23 @@ def extract_tables_from_page(
     
     # OPTIMIZATION: Smart Table Guard
     # Skip expensive ONNX model if page doesn't look like a table
+    # (text is extracted inside the guard, so a bad page falls back to scanning)
     if not should_scan_for_tables(page):
         return []
 
+    # Parse the page's text layout once; every strategy looks lines up in it
+    try:
+        page_dict = _page_text_dict(page)
+    except Exception:
+        page_dict = None
+
     # Try all strategies
     results = {}
     
     for strategy in TABLE_STRATEGIES:
         try:
             tables = extract_tables_from_page_with_strategy(
-                page, page_number, source_file, find_captions, strategy
+                page, page_number, source_file, find_captions, strategy, page_dict
             )
             
             # Post-process tables
@@ -736,32 +946,18 @@ def extract_tables_from_page(
                     processed_tables.append(processed)
             
             # Score this strategy result
-            if not processed_tables:
-                score = 0
-            else:
-                # Score formula: (rows * cols) * data_density
-                score = 0
-                for t in processed_tables:
-                    cells = (t.row_count + (1 if t.headers else 0)) * t.col_count
-                    
-                    # Calculate density (non-empty cells / total cells)
-                    non_empty = 0
-                    if t.headers:
-                        non_empty += sum(1 for h in t.headers if h.strip())
-                    for row in t.rows:
-                        non_empty += sum(1 for c in row if c.strip())
-                    
-                    density = non_empty / cells if cells > 0 else 0
-                    
-                    # Reward larger tables, but heavily penalize sparse ones (likely garbage)
-                    table_score = cells * (density ** 2) # Square density to punish sparsity more
-                    score += table_score
+            score, confident = _score_tables(processed_tables)
             
             results[strategy] = (score, processed_tables)
             
             if score > best_score:
                 best_score = score
                 best_tables = processed_tables
+
+            # Dense, multi-row tables from the strict (ruled) strategy are
+            # what the looser strategies would at best reproduce; stop here
+            if strategy == "lines_strict" and confident:
+                break
                 
         except Exception:
             continue
@@ -858,12 +1054,70 @@ def extract_tables_from_page_legacy(
     return tables
 
 
+def _extract_page_tables(
+    doc: pymupdf.Document,
+    page_idx: int,
+    source_file: str,
+    find_captions: bool,
+    use_markdown_fallback: bool,
+) -> list[ExtractedTable]:
+    """Extract one page's tables: find_tables strategies, then the markdown fallback."""
+    page = doc[page_idx]
+    page_number = page_idx + 1
+
+    # Try PyMuPDF find_tables first
+    page_tables = extract_tables_from_page(
+        page,
+        page_number,
+        source_file=source_file,
+        find_captions=find_captions,
+    )
+
+    # If no good tables found and markdown fallback enabled, try that
+    if use_markdown_fallback and HAS_PYMUPDF4LLM:
+        pymupdf_score = sum(t.row_count * t.col_count for t in page_tables)
+
+        # Try markdown extraction
+        md_tables = extract_tables_from_markdown(doc, page_number, source_file)
+        md_score = sum(t.row_count * t.col_count for t in md_tables)
+
+        # Use markdown tables if they're better
+        if md_score > pymupdf_score:
+            page_tables = md_tables
+
+    return page_tables
+
+
+# Per-worker-process document handle, opened by _init_table_worker; it is
+# released when the pool shuts the worker process down
+_WORKER_DOC: pymupdf.Document | None = None
+
+
+def _init_table_worker(pdf_path: str) -> None:
+    """Open the PDF once per worker process (Page objects can't cross processes)."""
+    global _WORKER_DOC
+    _WORKER_DOC = pymupdf.open(pdf_path)
+
+
+def _extract_page_in_worker(
+    page_idx: int,
+    source_file: str,
+    find_captions: bool,
+    use_markdown_fallback: bool,
+) -> list[ExtractedTable]:
+    """Worker: extract one page's tables from the worker's already-open document."""
+    return _extract_page_tables(
+        _WORKER_DOC, page_idx, source_file, find_captions, use_markdown_fallback
+    )
+
+
 def extract_tables_from_pdf(
     pdf_path: str | Path,
     pages: list[int] | None = None,
     find_captions: bool = True,
     use_markdown_fallback: bool = True,
     merge_continuations: bool = True,
+    max_workers: int | None = None,
 ) -> TableExtractionResult:
     """
     Extract all tables from a PDF document.
@@ -872,11 +1126,17 @@ def extract_tables_from_pdf(
     1. PyMuPDF find_tables() with different strategies
     2. pymupdf4llm markdown extraction as fallback
 
+    Pages are independent, so documents with at least PARALLEL_MIN_PAGES pages
+    are processed on a process pool. Each worker opens the PDF once (Page
+    objects can't cross processes) and then takes small runs of pages.
+
     Args:
         pdf_path: Path to the PDF file
         pages: Specific pages to extract from (1-indexed), or None for all
         find_captions: Whether to search for table captions
         use_markdown_fallback: Whether to use pymupdf4llm as fallback
+        max_workers: Worker processes (default: TABLE_CONCURRENCY env var,
+            else CPU count); 1 disables the pool
 
     Returns:
         TableExtractionResult with all extracted tables
@@ -896,35 +1156,40 @@ def extract_tables_from_pdf(
         if pages:
             page_indices = [p - 1 for p in pages if 0 <= p - 1 < len(doc)]
         else:
-            page_indices = range(len(doc))
-
-        for page_idx in page_indices:
-            page = doc[page_idx]
-            page_number = page_idx + 1
-            print(f"    Scanning tables on page {page_number}/{len(doc)}...", end="\r")
-            
-            # Try PyMuPDF find_tables first
-            page_tables = extract_tables_from_page(
-                page,
-                page_number,
-                source_file=pdf_path.name,
-                find_captions=find_captions,
-            )
-
-            # If no good tables found and markdown fallback enabled, try that
-            if use_markdown_fallback and HAS_PYMUPDF4LLM:
-                pymupdf_score = sum(t.row_count * t.col_count for t in page_tables)
-
-                # Try markdown extraction
-                md_tables = extract_tables_from_markdown(doc, page_number, pdf_path.name)
-                md_score = sum(t.row_count * t.col_count for t in md_tables)
-
-                # Use markdown tables if they're better
-                if md_score > pymupdf_score:
-                    page_tables = md_tables
-
+            page_indices = list(range(len(doc)))
+
+        workers = min(max_workers or env_concurrency("TABLE_CONCURRENCY"), len(page_indices))
+        if workers <= 1 or len(page_indices) < PARALLEL_MIN_PAGES:
+            page_results = []
+            for page_idx in page_indices:
+                print(f"    Scanning tables on page {page_idx + 1}/{len(doc)}...", end="\r")
+                page_results.append(
+                    _extract_page_tables(
+                        doc, page_idx, pdf_path.name, find_captions, use_markdown_fallback
+                    )
+                )
+        else:
+            print(f"    Scanning tables on {len(page_indices)} pages ({workers} workers)...", end="\r")
+            # Small runs of pages keep table-heavy stretches from stalling one
+            # worker while the rest sit idle; map() keeps page order
+            chunksize = max(1, len(page_indices) // (workers * PAGE_CHUNKS_PER_WORKER))
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_table_worker,
+                initargs=(str(pdf_path),),
+            ) as executor:
+                page_results = list(executor.map(
+                    _extract_page_in_worker,
+                    page_indices,
+                    repeat(pdf_path.name),
+                    repeat(find_captions),
+                    repeat(use_markdown_fallback),
+                    chunksize=chunksize,
+                ))
+
+        for page_idx, page_tables in zip(page_indices, page_results):
             if page_tables:
-                pages_with_tables.append(page_number)
+                pages_with_tables.append(page_idx + 1)
                 all_tables.extend(page_tables)
 
         if merge_continuations and all_tables:
@@ -965,8 +1230,12 @@ def save_tables(
 
     if "json" in formats:
         json_path = output_dir / f"{base_name}_tables.json"
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
+        if HAS_ORJSON:
+            # orjson always emits UTF-8, matching ensure_ascii=False
+            json_path.write_bytes(orjson.dumps(result.to_dict(), option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
         saved_files["json"] = json_path
 
     if "markdown" in formats:
@@ -982,10 +1251,11 @@ def save_tables(
         csv_dir = output_dir / f"{base_name}_tables_csv"
         csv_dir.mkdir(parents=True, exist_ok=True)
 
+        # One file per table is the output format, so the per-file cost is kept
+        # minimal: pre-encoded bytes, no text-layer (codec/newline) wrapper
         for table in result.tables:
             csv_path = csv_dir / f"table_p{table.page_number}_{table.table_id[:8]}.csv"
-            with open(csv_path, "w", encoding="utf-8", newline="") as f:
-                f.write(table.to_csv())
+            csv_path.write_bytes(table.to_csv().encode("utf-8"))
 
         saved_files["csv"] = csv_dir
 
@@ -1011,24 +1281,16 @@ def tables_to_chunks(
     chunks = []
 
     for table in result.tables:
-        # Build chunk text
-        text_parts = []
-
-        if table.caption:
-            text_parts.append(f"Table: {table.caption}")
-        else:
-            text_parts.append(f"Table on Page {table.page_number}")
-
+        # Build chunk text in one concatenation; each rendering runs only if requested
+        text = f"Table: {table.caption}" if table.caption else f"Table on Page {table.page_number}"
         if include_text:
-            text_parts.append(table.to_text())
-
+            text += "\n" + table.to_text()
         if include_markdown:
-            text_parts.append("\nMarkdown representation:")
-            text_parts.append(table.to_markdown())
+            text += "\n\nMarkdown representation:\n" + table.to_markdown()
 
         chunk = {
             "id": f"table_{table.table_id}",
-            "text": "\n".join(text_parts),
+            "text": text,
             "metadata": {
                 "type": "table",
                 "table_id": table.table_id,
@@ -1048,7 +1310,7 @@ def tables_to_chunks(
 
 
 def _normalize_header_cell(text: str) -> str:
-    return re.sub(r"\W+", " ", text.lower()).strip()
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
 
 
 def _header_signature(headers: list[str]) -> str:
@@ -1075,7 +1337,7 @@ def _header_similarity(a: list[str], b: list[str]) -> float:
 def _extract_table_number(caption: str) -> str | None:
     if not caption:
         return None
-    match = re.search(r"Table\s+([IVX]+|\d+)", caption, re.IGNORECASE)
+    match = _TABLE_NUMBER_RE.search(caption)
     return match.group(1).lower() if match else None
 
 
@@ -15,14 +15,31 @@ Strategy:
 6. Extract these regions as screenshots.
 """
 
+import hashlib
 import io
+import json
+import math
+import os
 import re
-from collections import defaultdict
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import chain, repeat
 from pathlib import Path
+from typing import Iterator
 
 import pymupdf as fitz
 
+from nexus.utils.concurrency import env_concurrency
+
+# Optional vectorized bbox filtering for drawing-heavy pages
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 
 # =============================================================================
 # Configuration Constants
@@ -36,8 +53,46 @@ MARGIN_BOTTOM_PERCENT = 0.05   # Bottom 5% of page
 STAMP_REPETITION_THRESHOLD = 3  # Must appear on 3+ pages to be a "stamp"
 STAMP_POSITION_TOLERANCE = 10   # Pixels tolerance for position matching
 
+# Page-parallel scanning: below this many pages the process pool isn't worth it
+PARALLEL_MIN_PAGES = 4
+MAX_MATH_WORKERS = 4            # Scaling flattens out past ~4 PyMuPDF processes
+PAGE_CHUNKS_PER_WORKER = 8      # Page runs per worker, for load balancing
+
+# MuPDF caches fonts/images of every page it parses; empty that store this often
+STORE_SHRINK_PAGES = 50
+
+# Rendering fewer candidates than this isn't worth a process pool
+PARALLEL_MIN_CANDIDATES = 8
+
+# Crops larger than this many pixels at the requested DPI render at a lower zoom
+MAX_RENDER_PIXELS = 2_000_000
+
+# Crop image formats and their file extensions
+IMAGE_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+# Below this many boxes, building numpy arrays costs more than the Python loop
+NUMPY_MIN_BOXES = 256
+PAIR_BLOCK_SIZE = 1 << 20       # Max box pairs compared per vectorized merge step
 
-@dataclass
+# Math text heuristics, compiled once (run for every candidate region)
+_MATH_OPERATOR_RE = re.compile(r"[=<>±+\-×*/^_]")
+_MATH_SYMBOL_RE = re.compile(r"[∑∏∫√≈≤≥]")
+_GREEK_RE = re.compile(r"[\u0370-\u03FF]")
+_DIGIT_RE = re.compile(r"\d")
+_BRACKET_RE = re.compile(r"[()\[\]]")
+_ALPHA_ONLY_RE = re.compile(r"[A-Za-z\s]{6,}")
+
+# LaTeX validation
+_LATEX_OPERATOR_RE = re.compile(r"[=<>±+\-*/^_]")
+_LATEX_COMMON_CMD_RE = re.compile(
+    r"\\(?:frac|sum|int|sqrt|alpha|beta|gamma|delta|theta|lambda|mu|nu|pi|rho"
+    r"|sigma|tau|phi|psi|omega|cdot|times|mathbb|mathbf|mathrm)"
+)
+_LETTER_RE = re.compile(r"[A-Za-z]")
+_NON_SPACE_RE = re.compile(r"[^\s]")
+
+
+@dataclass(slots=True)
 class VisualCandidate:
     """A detected visual region (Math/Table) on a page."""
     page_number: int
@@ -71,13 +126,120 @@ class VisualCandidate:
 
 def boxes_intersect(box1: tuple, box2: tuple, tolerance: float = 2) -> bool:
     """Check if two rectangles intersect (with tolerance)."""
-    x0_1, y0_1, x1_1, y1_1 = box1
-    x0_2, y0_2, x1_2, y1_2 = box2
+    # Indexed compares short-circuit on the first miss, no unpacking
+    return (box1[2] >= box2[0] - tolerance and
+            box1[0] <= box2[2] + tolerance and
+            box1[3] >= box2[1] - tolerance and
+            box1[1] <= box2[3] + tolerance)
 
-    return not (x1_1 < x0_2 - tolerance or
-                x0_1 > x1_2 + tolerance or
-                y1_1 < y0_2 - tolerance or
-                y0_1 > y1_2 + tolerance)
+
+def boxes_intersect_many(a: "np.ndarray", b: "np.ndarray", tolerance: float = 2) -> "np.ndarray":
+    """
+    boxes_intersect for every pair of rows of two (N, 4) and (M, 4) box arrays.
+
+    Returns an (N, M) boolean matrix; requires numpy.
+    """
+    return ~(
+        (a[:, None, 2] < b[None, :, 0] - tolerance)
+        | (a[:, None, 0] > b[None, :, 2] + tolerance)
+        | (a[:, None, 3] < b[None, :, 1] - tolerance)
+        | (a[:, None, 1] > b[None, :, 3] + tolerance)
+    )
+
+
+def _close_pairs(arr: "np.ndarray", x_tol: float, y_tol: float) -> Iterator[tuple[int, int]]:
+    """
+    Vectorized sweep: index pairs (i < j) of close boxes in a (y0, x0)-sorted (N, 4) array.
+
+    Each box's sweep window (the following boxes starting within y1 + y_tol)
+    is expanded into explicit pairs and tested in one set of array compares;
+    rows are taken in blocks of at most PAIR_BLOCK_SIZE pairs to bound memory.
+    """
+    n = len(arr)
+    ends = np.searchsorted(arr[:, 1], arr[:, 3] + y_tol, side="right")
+    counts = np.maximum(ends - np.arange(1, n + 1), 0)
+    totals = np.cumsum(counts)
+
+    start = 0
+    while start < n:
+        done = int(totals[start - 1]) if start else 0
+        stop = max(int(np.searchsorted(totals, done + PAIR_BLOCK_SIZE, side="right")), start + 1)
+        block = counts[start:stop]
+        i_idx = np.repeat(np.arange(start, stop), block)
+        # Offset of each pair within its row's window
+        offsets = np.arange(len(i_idx)) - np.repeat(np.cumsum(block) - block, block)
+        j_idx = i_idx + 1 + offsets
+        a, b = arr[i_idx], arr[j_idx]
+        close = (
+            (b[:, 3] >= a[:, 1] - y_tol)
+            & (b[:, 0] <= a[:, 2] + x_tol)
+            & (b[:, 2] >= a[:, 0] - x_tol)
+        )
+        yield from zip(i_idx[close].tolist(), j_idx[close].tolist())
+        start = stop
+
+
+def _cluster_boxes(boxes: list[tuple], x_tol: float, y_tol: float) -> list[tuple]:
+    """
+    One sweep-line union-find pass: group pairwise-close boxes, return group bboxes.
+
+    Boxes are visited in (y0, x0) order, so each box only needs comparing with
+    the following boxes until one starts below its y1 + y_tol.
+    """
+    boxes = sorted(boxes, key=lambda b: (b[1], b[0]))
+    n = len(boxes)
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # Path halving
+            i = parent[i]
+        return i
+
+    if HAS_NUMPY and n >= NUMPY_MIN_BOXES:
+        for i, j in _close_pairs(np.asarray(boxes, dtype=np.float64), x_tol, y_tol):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[root_j] = root_i
+    else:
+        for i in range(n):
+            x0, y0, x1, y1 = boxes[i]
+            x_lo, x_hi = x0 - x_tol, x1 + x_tol
+            y_lo, y_hi = y0 - y_tol, y1 + y_tol
+            # i's root, found on its first close neighbour; unions below only
+            # attach other roots to it, so it stays a root for the whole row
+            root_i = -1
+            j = i + 1
+            while j < n:
+                o_x0, o_y0, o_x1, o_y1 = boxes[j]
+                if o_y0 > y_hi:
+                    break  # Sorted by y0: nothing further down can be close
+                # Vertical overlap or close proximity, then horizontal
+                if o_y1 >= y_lo and o_x0 <= x_hi and o_x1 >= x_lo:
+                    if root_i < 0:
+                        root_i = find(i)
+                    root_j = find(j)
+                    if root_i != root_j:
+                        parent[root_j] = root_i
+                j += 1
+
+    # Reduce each group to its bbox; groups come out in (y0, x0) order of their first box
+    groups: dict[int, list[float]] = {}
+    for i, (x0, y0, x1, y1) in enumerate(boxes):
+        root = find(i)
+        group = groups.get(root)
+        if group is None:
+            groups[root] = [x0, y0, x1, y1]
+        else:
+            if x0 < group[0]:
+                group[0] = x0
+            if y0 < group[1]:
+                group[1] = y0
+            if x1 > group[2]:
+                group[2] = x1
+            if y1 > group[3]:
+                group[3] = y1
+    return [tuple(group) for group in groups.values()]
 
 
 def merge_boxes(boxes: list[tuple], x_tol: float = 20, y_tol: float = 10) -> list[tuple]:
@@ -87,47 +249,250 @@ def merge_boxes(boxes: list[tuple], x_tol: float = 20, y_tol: float = 10) -> lis
 
     Math equations are often rendered as many small vector paths
     (each symbol, fraction line, etc.). This merges them.
+
+    Merged regions can become close to boxes none of their members were
+    close to, so clustering repeats on the merged regions until stable.
+    A pass that merges nothing is already stable and ends the loop.
     """
     if not boxes:
         return []
 
-    # Make a copy to avoid mutating input
-    boxes = list(boxes)
-
-    # Sort by Y then X
-    boxes.sort(key=lambda b: (b[1], b[0]))
-
-    merged = []
-    while boxes:
-        current = boxes.pop(0)
-        curr_x0, curr_y0, curr_x1, curr_y1 = current
-
-        changed = True
-        while changed:
-            changed = False
-            rest = []
-            for other in boxes:
-                o_x0, o_y0, o_x1, o_y1 = other
-
-                # Check for proximity/overlap
-                # Vertical overlap or close proximity
-                vertical_close = (o_y0 <= curr_y1 + y_tol) and (o_y1 >= curr_y0 - y_tol)
-                horizontal_close = (o_x0 <= curr_x1 + x_tol) and (o_x1 >= curr_x0 - x_tol)
-
-                if vertical_close and horizontal_close:
-                    # Merge the boxes
-                    curr_x0 = min(curr_x0, o_x0)
-                    curr_y0 = min(curr_y0, o_y0)
-                    curr_x1 = max(curr_x1, o_x1)
-                    curr_y1 = max(curr_y1, o_y1)
-                    changed = True
-                else:
-                    rest.append(other)
-            boxes = rest
+    merged = list(boxes)
+    while True:
+        regrouped = _cluster_boxes(merged, x_tol, y_tol)
+        if len(regrouped) == len(merged):
+            return regrouped
+        merged = regrouped
+
+
+def _index_image_bboxes(
+    image_bboxes: list[tuple], tolerance: float = 2
+) -> tuple[list[float], list[tuple], float]:
+    """
+    Inflate image bboxes by tolerance once and sort them by y0.
+
+    Images lying inside another image are dropped: anything touching them also
+    touches the enclosing image. Largest images are kept first, so nested
+    figure parts collapse into their figure.
+
+    Returns (sorted y0 keys, inflated boxes, tallest inflated height) for
+    _hits_known_image; the height bounds how far above a box an image can start.
+    """
+    kept: list[tuple] = []
+    for x0, y0, x1, y1 in sorted(
+        ((x0 - tolerance, y0 - tolerance, x1 + tolerance, y1 + tolerance)
+         for x0, y0, x1, y1 in image_bboxes),
+        key=lambda b: (b[2] - b[0]) * (b[3] - b[1]),
+        reverse=True,
+    ):
+        if not any(
+            k[0] <= x0 and k[1] <= y0 and x1 <= k[2] and y1 <= k[3] for k in kept
+        ):
+            kept.append((x0, y0, x1, y1))
+    inflated = sorted(kept, key=lambda b: b[1])
+    max_height = max((b[3] - b[1] for b in inflated), default=0.0)
+    return [b[1] for b in inflated], inflated, max_height
+
+
+def _hits_known_image(box: tuple, image_index: tuple[list[float], list[tuple], float]) -> bool:
+    """boxes_intersect(box, image) for any indexed image, scanning only images in box's y-range."""
+    y0_keys, inflated, max_height = image_index
+    x0, y0, x1, y1 = box
+    # Only images whose (inflated) top lies in [y0 - tallest image, y1] can overlap
+    lo = bisect_left(y0_keys, y0 - max_height)
+    hi = bisect_right(y0_keys, y1)
+    for ix0, iy0, ix1, iy1 in inflated[lo:hi]:
+        if x1 >= ix0 and x0 <= ix1 and y0 <= iy1:
+            return True
+    return False
+
+
+def _index_words(words: list[tuple]) -> tuple[list[float], list[tuple], float, "np.ndarray | None"]:
+    """
+    Sort page words (get_text("words") tuples) by y0 for _words_in_rect.
+
+    Returns (sorted y0 keys, (y0, reading-order index, word) entries, tallest
+    word height, (x0, x1, y1) array or None); the height bounds how far above
+    a rect a word can start. The array, built for word-heavy pages, lets
+    _words_in_rect test wide windows with array compares.
+    """
+    entries = sorted((w[1], i, w) for i, w in enumerate(words))
+    max_height = max((w[3] - w[1] for w in words), default=0.0)
+    coords = None
+    if HAS_NUMPY and len(entries) >= NUMPY_MIN_BOXES:
+        coords = np.array([(w[0], w[2], w[3]) for _, _, w in entries], dtype=np.float64)
+    return [e[0] for e in entries], entries, max_height, coords
+
+
+def _words_in_rect(
+    word_index: tuple[list[float], list[tuple], float, "np.ndarray | None"], rect: tuple
+) -> str:
+    """Space-joined text, in reading order, of indexed page words intersecting rect."""
+    y0_keys, entries, max_height, coords = word_index
+    rx0, ry0, rx1, ry1 = rect
+    # Only words starting within [ry0 - tallest word, ry1) can reach into rect
+    lo = bisect_right(y0_keys, ry0 - max_height)
+    hi = bisect_left(y0_keys, ry1)
+    if coords is not None and hi - lo >= NUMPY_MIN_BOXES:
+        window = coords[lo:hi]
+        inside = np.flatnonzero((window[:, 0] < rx1) & (rx0 < window[:, 1]) & (ry0 < window[:, 2]))
+        hits = sorted((entries[k][1], entries[k][2][4]) for k in (inside + lo).tolist())
+    else:
+        hits = sorted(
+            (i, w[4]) for _, i, w in entries[lo:hi]
+            if w[0] < rx1 and rx0 < w[2] and ry0 < w[3]
+        )
+    return " ".join(text for _, text in hits)
+
 
-        merged.append((curr_x0, curr_y0, curr_x1, curr_y1))
+def _path_boxes(paths: list[dict], page_w: float, page_h: float) -> list[tuple]:
+    """
+    Bboxes of drawing paths, minus page-sized borders and tiny noise.
 
-    return merged
+    Collecting and filtering happen in the same pass over the paths.
+    """
+    max_w, max_h = page_w * 0.9, page_h * 0.9
+    if HAS_NUMPY and len(paths) >= NUMPY_MIN_BOXES:
+        rects = [rect for item in paths if (rect := item.get("rect"))]
+        if not rects:
+            return []
+        # Coordinates stream straight into the array; only kept boxes become tuples
+        arr = np.fromiter(
+            chain.from_iterable(rects), dtype=np.float64, count=4 * len(rects)
+        ).reshape(-1, 4)
+        w = arr[:, 2] - arr[:, 0]
+        h = arr[:, 3] - arr[:, 1]
+        keep = (w <= max_w) & (h <= max_h) & ~((w < 3) & (h < 3))
+        return [tuple(box) for box in arr[keep].tolist()]
+
+    clean_boxes = []
+    for item in paths:
+        rect = item.get("rect")
+        if not rect:
+            continue
+        x0, y0, x1, y1 = rect
+        w = x1 - x0
+        h = y1 - y0
+
+        # Ignore full page borders
+        if w > max_w or h > max_h:
+            continue
+        # Ignore tiny noise (single pixels, dots)
+        if w < 3 and h < 3:
+            continue
+
+        clean_boxes.append((x0, y0, x1, y1))
+    return clean_boxes
+
+
+def _region_is_plausible(
+    box: tuple,
+    margin_top: float,
+    margin_bottom: float,
+    apply_margin_guard: bool,
+) -> bool:
+    """Margin Guard and shape sanity checks for one merged region."""
+    # Calculate dimensions
+    w = box[2] - box[0]
+    h = box[3] - box[1]
+    y_center = (box[1] + box[3]) / 2
+
+    # Filter 5: Margin Guard - exclude header/footer zones
+    if apply_margin_guard:
+        # Check if center of region is in margin zones
+        if y_center < margin_top or y_center > margin_bottom:
+            return False
+
+    # Filter 6: Sanity checks for equation-like regions
+    # Must be at least somewhat visible
+    if w < 15 or h < 8:
+        return False
+
+    # Drop very small regions (likely icons)
+    if (w * h) < 1200:
+        return False
+
+    # Equations are usually wider than tall (fractions can be taller)
+    # Very tall narrow regions are likely decorative lines
+    aspect = w / h if h > 0 else 0
+    if aspect < 0.3 and h > 100:
+        # Likely a vertical line/border
+        return False
+
+    # Very wide thin regions are likely horizontal rules
+    if aspect > 20 and h < 5:
+        return False
+
+    return True
+
+
+def _plausible_region_mask(
+    regions: list[tuple],
+    margin_top: float,
+    margin_bottom: float,
+    apply_margin_guard: bool,
+) -> list[bool]:
+    """_region_is_plausible for every region, as one set of array ops when large."""
+    if not (HAS_NUMPY and len(regions) >= NUMPY_MIN_BOXES):
+        return [
+            _region_is_plausible(box, margin_top, margin_bottom, apply_margin_guard)
+            for box in regions
+        ]
+
+    arr = np.asarray(regions, dtype=np.float64)
+    w = arr[:, 2] - arr[:, 0]
+    h = arr[:, 3] - arr[:, 1]
+    aspect = np.divide(w, h, out=np.zeros_like(w), where=h > 0)
+    keep = (w >= 15) & (h >= 8) & (w * h >= 1200)
+    keep &= ~((aspect < 0.3) & (h > 100)) & ~((aspect > 20) & (h < 5))
+    if apply_margin_guard:
+        y_center = (arr[:, 1] + arr[:, 3]) / 2
+        keep &= (y_center >= margin_top) & (y_center <= margin_bottom)
+    return keep.tolist()
+
+
+class DrawingCache:
+    """
+    On-disk cache of each page's drawing-path boxes, keyed by PDF content hash.
+
+    Path extraction dominates scanning of vector-heavy pages, so reruns over
+    an unchanged PDF (e.g. threshold sweeps) read the boxes back instead.
+    """
+
+    def __init__(self, cache_dir: str | Path, pdf_hash: str, refresh: bool = False):
+        self.cache_dir = Path(cache_dir) / pdf_hash
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.refresh = refresh  # Ignore existing entries (they are rewritten)
+
+    @staticmethod
+    def hash_pdf(pdf_path: str | Path) -> str:
+        h = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _path(self, page_index: int) -> Path:
+        return self.cache_dir / f"p{page_index}.json"
+
+    def get(self, page_index: int) -> list[tuple] | None:
+        if self.refresh:
+            return None
+        path = self._path(page_index)
+        if not path.exists():
+            return None
+        try:
+            boxes = json.loads(path.read_bytes())
+        except Exception:
+            return None
+        return [tuple(box) for box in boxes] if isinstance(boxes, list) else None
+
+    def put(self, page_index: int, boxes: list[tuple]) -> None:
+        """Atomically write a page's boxes (temp file + rename), as ExtractionCache does."""
+        path = self._path(page_index)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(boxes), encoding="utf-8")
+        os.replace(tmp_path, path)
 
 
 def extract_equation_candidates(
@@ -136,6 +501,7 @@ def extract_equation_candidates(
     known_image_bboxes: list[tuple] | None = None,
     min_paths_threshold: int = 5,
     apply_margin_guard: bool = True,
+    drawing_cache: DrawingCache | None = None,
 ) -> list[VisualCandidate]:
     """
     Find regions on the page that contain vector graphics but aren't standard images.
@@ -148,49 +514,32 @@ def extract_equation_candidates(
         known_image_bboxes: Bounding boxes of known images to exclude
         min_paths_threshold: Minimum number of paths in a region to consider it
         apply_margin_guard: Whether to exclude header/footer zones
+        drawing_cache: Cache of per-page path boxes from earlier runs
 
     Returns:
         List of VisualCandidate objects
     """
     page = doc[page_index]
 
-    try:
-        paths = page.get_drawings()
-    except Exception:
-        return []
-
-    if not paths:
-        return []
-
     # Calculate margin zones (Margin Guard)
-    page_w, page_h = page.rect.width, page.rect.height
+    page_rect = page.rect
+    page_w, page_h = page_rect.width, page_rect.height
     margin_top = page_h * MARGIN_TOP_PERCENT
     margin_bottom = page_h * (1 - MARGIN_BOTTOM_PERCENT)
 
-    # 1. Get bbox of every drawing path
-    path_boxes = []
-    for item in paths:
-        rect = item.get("rect")
-        if rect:
-            path_boxes.append(tuple(rect))
-
-    if not path_boxes:
-        return []
-
-    # 2. Filter out page-sized borders or tiny dots
-    clean_boxes = []
-    for box in path_boxes:
-        w = box[2] - box[0]
-        h = box[3] - box[1]
-
-        # Ignore full page borders
-        if w > page_w * 0.9 or h > page_h * 0.9:
-            continue
-        # Ignore tiny noise (single pixels, dots)
-        if w < 3 and h < 3:
-            continue
+    clean_boxes = drawing_cache.get(page_index) if drawing_cache is not None else None
+    if clean_boxes is None:
+        try:
+            # Raw path dicts: same "rect" values as get_drawings(), minus the
+            # per-path Rect/Point object construction we'd never use
+            paths = page.get_cdrawings()
+        except Exception:
+            return []
 
-        clean_boxes.append(box)
+        # 1-2. Get bbox of every drawing path, dropping page-sized borders or tiny dots
+        clean_boxes = _path_boxes(paths, page_w, page_h) if paths else []
+        if drawing_cache is not None:
+            drawing_cache.put(page_index, clean_boxes)
 
     if len(clean_boxes) < min_paths_threshold:
         # Not enough paths to form meaningful equations
@@ -201,57 +550,41 @@ def extract_equation_candidates(
 
     # 4. Filter against known images (Phase 3 outputs) to avoid duplicates
     final_candidates = []
-    if known_image_bboxes is None:
-        known_image_bboxes = []
-
-    for box in merged_regions:
-        # Check intersection with known images
-        is_known_image = False
-        for img_box in known_image_bboxes:
-            if boxes_intersect(box, img_box):
-                is_known_image = True
-                break
-
-        if is_known_image:
-            continue
+    # Page words, extracted and y-indexed once on first use, shared by every region
+    words = None
 
-        # Calculate dimensions
-        w = box[2] - box[0]
-        h = box[3] - box[1]
-        y_center = (box[1] + box[3]) / 2
-
-        # Filter 5: Margin Guard - exclude header/footer zones
-        if apply_margin_guard:
-            # Check if center of region is in margin zones
-            if y_center < margin_top or y_center > margin_bottom:
-                continue
-
-        # Filter 6: Sanity checks for equation-like regions
-        # Must be at least somewhat visible
-        if w < 15 or h < 8:
-            continue
+    # Margin Guard and shape checks are pure geometry: evaluate them up front
+    plausible = _plausible_region_mask(
+        merged_regions, margin_top, margin_bottom, apply_margin_guard
+    )
 
-        # Drop very small regions (likely icons)
-        if (w * h) < 1200:
+    if HAS_NUMPY and known_image_bboxes and len(merged_regions) >= NUMPY_MIN_BOXES:
+        # Region-heavy page: test every region against every image in one broadcast
+        hits = boxes_intersect_many(
+            np.asarray(merged_regions, dtype=np.float64),
+            np.asarray(known_image_bboxes, dtype=np.float64),
+        ).any(axis=1)
+        plausible = (np.asarray(plausible) & ~hits).tolist()
+        image_index = _index_image_bboxes([])
+    else:
+        image_index = _index_image_bboxes(known_image_bboxes or [])
+
+    for box, is_plausible in zip(merged_regions, plausible):
+        if not is_plausible:
             continue
 
-        # Equations are usually wider than tall (fractions can be taller)
-        # Very tall narrow regions are likely decorative lines
-        aspect = w / h if h > 0 else 0
-        if aspect < 0.3 and h > 100:
-            # Likely a vertical line/border
+        # Check intersection with known images
+        if _hits_known_image(box, image_index):
             continue
 
-        # Very wide thin regions are likely horizontal rules
-        if aspect > 20 and h < 5:
-            continue
-            
         # Feature B: Text-Graphic Fusion
         # Check for text inside or overlapping with the box
         # Expand box slightly to catch subscripts/superscripts
-        search_rect = fitz.Rect(box[0]-2, box[1]-2, box[2]+2, box[3]+2)
-        text_content = page.get_text("text", clip=search_rect).strip()
-        
+        if words is None:
+            words = _index_words(page.get_text("words"))
+        search_rect = (box[0]-2, box[1]-2, box[2]+2, box[3]+2)
+        text_content = _words_in_rect(words, search_rect)
+
         # Clean up text (remove excessive whitespace)
         text_content = " ".join(text_content.split())
 
@@ -269,6 +602,65 @@ def extract_equation_candidates(
     return final_candidates
 
 
+def _encode_pixmap(pix: fitz.Pixmap, image_format: str, quality: int) -> bytes:
+    """Encode a rendered crop; WebP goes through Pillow, PNG and JPEG stay in MuPDF."""
+    if image_format == "webp":
+        return pix.pil_tobytes(format="WEBP", quality=quality)
+    if image_format == "jpeg":
+        return pix.tobytes("jpeg", jpg_quality=quality)
+    return pix.tobytes("png")
+
+
+def _render_candidate(
+    page: fitz.Page,
+    cand: VisualCandidate,
+    save_path: Path,
+    dpi: int,
+    padding: int,
+    image_format: str = "png",
+    quality: int = 90,
+) -> tuple[fitz.Pixmap, bytes] | None:
+    """
+    Render a candidate region (padded, clipped to the page) and save it.
+
+    Returns the pixmap and its encoded bytes, so OCR never re-encodes a PNG.
+    """
+    # Add padding around the region
+    rect = fitz.Rect(
+        cand.bbox[0] - padding,
+        cand.bbox[1] - padding,
+        cand.bbox[2] + padding,
+        cand.bbox[3] + padding
+    )
+
+    # Clip to page bounds
+    rect = rect & page.rect
+
+    if rect.is_empty:
+        return None
+
+    # Render at high resolution, scaled down for crops past MAX_RENDER_PIXELS
+    zoom = min(dpi / 72, math.sqrt(MAX_RENDER_PIXELS / (rect.width * rect.height)))
+    try:
+        pix = page.get_pixmap(clip=rect, matrix=fitz.Matrix(zoom, zoom))
+        data = _encode_pixmap(pix, image_format, quality)
+        save_path.write_bytes(data)
+    except Exception:
+        return None
+    return pix, data
+
+
+def _candidate_metadata(cand: VisualCandidate, filename: str) -> dict:
+    return {
+        "filename": filename,
+        "page": cand.page_number,
+        "bbox": list(cand.bbox),
+        "type": cand.type,
+        "width": cand.width,
+        "height": cand.height,
+    }
+
+
 def save_candidates(
     doc: fitz.Document,
     candidates: list[VisualCandidate],
@@ -278,67 +670,85 @@ def save_candidates(
     ocr_latex: bool = False,
     latex_ocr_engine: str = "pix2tex",
     drop_invalid_latex: bool = True,
+    max_workers: int | None = None,
+    image_format: str = "png",
+    image_quality: int = 90,
 ) -> list[dict]:
     """
     Save the candidate regions as high-resolution images.
 
+    Rendering dominates this step, so without LaTeX OCR (whose model lives in
+    this process) candidates of a file-backed document are rendered on a
+    process pool once there are at least PARALLEL_MIN_CANDIDATES of them.
+    Each worker opens the PDF once and takes small runs of candidates, so
+    a few huge crops don't leave the other workers idle.
+
     Args:
         doc: PyMuPDF document
         candidates: List of VisualCandidate objects
         output_dir: Directory to save images
         dpi: Resolution for rendering
         padding: Pixels to add around the region
+        max_workers: Rendering processes (default: as for page scanning)
+        image_format: "png", "jpeg" or "webp" (needs Pillow); the lossy
+            formats encode faster and smaller than PNG
+        image_quality: JPEG/WebP quality
 
     Returns:
         List of metadata dicts for each saved image
     """
+    if image_format not in IMAGE_EXTENSIONS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    _ensure_image_encoder_available(image_format)
+
     output_dir.mkdir(parents=True, exist_ok=True)
     metadata_list = []
 
-    for i, cand in enumerate(candidates):
-        page = doc[cand.page_number - 1]
+    # Generate filenames
+    ext = IMAGE_EXTENSIONS[image_format]
+    filenames = [f"math_p{cand.page_number}_{i:02d}.{ext}" for i, cand in enumerate(candidates)]
 
-        # Add padding around the region
-        rect = fitz.Rect(
-            cand.bbox[0] - padding,
-            cand.bbox[1] - padding,
-            cand.bbox[2] + padding,
-            cand.bbox[3] + padding
+    workers = min(
+        max_workers or env_concurrency("MATH_CONCURRENCY", cap=MAX_MATH_WORKERS), len(candidates)
+    )
+    if not ocr_latex and doc.name and workers > 1 and len(candidates) >= PARALLEL_MIN_CANDIDATES:
+        chunksize = max(1, len(candidates) // (workers * PAGE_CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_scan_worker,
+            initargs=(doc.name,),
+        ) as executor:
+            saved = list(executor.map(
+                _render_candidate_in_worker,
+                candidates,
+                [output_dir / filename for filename in filenames],
+                repeat(dpi),
+                repeat(padding),
+                repeat(image_format),
+                repeat(image_quality),
+                chunksize=chunksize,
+            ))
+        return [
+            _candidate_metadata(cand, filename)
+            for cand, filename, ok in zip(candidates, filenames, saved)
+            if ok
+        ]
+
+    for cand, filename in zip(candidates, filenames):
+        page = doc[cand.page_number - 1]
+        rendered = _render_candidate(
+            page, cand, output_dir / filename, dpi, padding, image_format, image_quality
         )
-
-        # Clip to page bounds
-        rect = rect & page.rect
-
-        if rect.is_empty:
+        if rendered is None:
             continue
+        pix, data = rendered
+        png = data if image_format == "png" else None
 
-        # Render at high resolution
-        try:
-            pix = page.get_pixmap(clip=rect, dpi=dpi)
-        except Exception:
-            continue
-
-        # Generate filename
-        filename = f"math_p{cand.page_number}_{i:02d}.png"
-        save_path = output_dir / filename
-
-        try:
-            pix.save(str(save_path))
-        except Exception:
-            continue
-
-        metadata = {
-            "filename": filename,
-            "page": cand.page_number,
-            "bbox": list(cand.bbox),
-            "type": cand.type,
-            "width": cand.width,
-            "height": cand.height,
-        }
+        metadata = _candidate_metadata(cand, filename)
 
         if ocr_latex:
             try:
-                latex = latex_ocr_from_pixmap(pix, engine=latex_ocr_engine)
+                latex = latex_ocr_from_pixmap(pix, engine=latex_ocr_engine, png=png)
                 if latex and _looks_like_latex_math(latex):
                     metadata["latex"] = latex
                 else:
@@ -355,12 +765,87 @@ def save_candidates(
     return metadata_list
 
 
+def _scan_pages(
+    doc: fitz.Document,
+    page_indices: list[int],
+    known_image_bboxes_by_page: dict[int, list[tuple]],
+    drawing_cache: DrawingCache | None = None,
+) -> list[VisualCandidate]:
+    """Collect equation candidates from the given pages, in page order."""
+    candidates: list[VisualCandidate] = []
+    for pages_done, page_idx in enumerate(page_indices, start=1):
+        candidates.extend(extract_equation_candidates(
+            doc,
+            page_idx,
+            known_image_bboxes=known_image_bboxes_by_page.get(page_idx + 1, []),
+            apply_margin_guard=True,
+            drawing_cache=drawing_cache,
+        ))
+        _trim_mupdf_store(pages_done)
+    return candidates
+
+
+def _trim_mupdf_store(pages_done: int) -> None:
+    """Empty MuPDF's global resource store every STORE_SHRINK_PAGES scanned pages."""
+    if pages_done % STORE_SHRINK_PAGES == 0:
+        fitz.TOOLS.store_shrink(100)
+
+
+# Per-worker-process document handle and drawing cache, set by _init_scan_worker.
+# Pool workers exit without running atexit hooks; process teardown releases the doc
+_WORKER_DOC: fitz.Document | None = None
+_WORKER_PAGES_SCANNED = 0
+_WORKER_DRAWING_CACHE: DrawingCache | None = None
+
+
+def _init_scan_worker(pdf_path: str, drawing_cache: DrawingCache | None = None) -> None:
+    """Open the PDF once per worker process (documents aren't picklable)."""
+    global _WORKER_DOC, _WORKER_DRAWING_CACHE
+    _WORKER_DOC = fitz.open(pdf_path)
+    _WORKER_DRAWING_CACHE = drawing_cache
+
+
+def _scan_page_in_worker(
+    page_idx: int,
+    known_image_bboxes: list[tuple],
+) -> list[VisualCandidate]:
+    """Worker: scan one page of the worker's already-open document."""
+    global _WORKER_PAGES_SCANNED
+    candidates = extract_equation_candidates(
+        _WORKER_DOC,
+        page_idx,
+        known_image_bboxes=known_image_bboxes,
+        apply_margin_guard=True,
+        drawing_cache=_WORKER_DRAWING_CACHE,
+    )
+    _WORKER_PAGES_SCANNED += 1
+    _trim_mupdf_store(_WORKER_PAGES_SCANNED)
+    return candidates
+
+
+def _render_candidate_in_worker(
+    cand: VisualCandidate,
+    save_path: Path,
+    dpi: int,
+    padding: int,
+    image_format: str,
+    quality: int,
+) -> bool:
+    """Worker: render and save one candidate from the worker's already-open document."""
+    page = _WORKER_DOC[cand.page_number - 1]
+    return _render_candidate(page, cand, save_path, dpi, padding, image_format, quality) is not None
+
+
 def extract_math_from_pdf(
     pdf_path: str | Path,
     output_dir: str | Path,
     known_image_bboxes_by_page: dict[int, list[tuple]] | None = None,
     ocr_latex: bool = False,
     latex_ocr_engine: str = "pix2tex",
+    max_workers: int | None = None,
+    drawing_cache_dir: str | Path | None = None,
+    refresh_drawing_cache: bool = False,
+    image_format: str = "png",
 ) -> list[dict]:
     """
     Extract all equation candidates from a PDF.
@@ -369,14 +854,29 @@ def extract_math_from_pdf(
     1. Per-page extraction with Margin Guard
     2. Cross-page Stamp Detection (removes repetitive logos/watermarks)
 
+    Pages are scanned on a process pool once the document has at least
+    PARALLEL_MIN_PAGES pages; each worker opens the PDF once and then takes
+    small runs of pages (about PAGE_CHUNKS_PER_WORKER runs per worker).
+
     Args:
         pdf_path: Path to the PDF file
         output_dir: Directory to save math images
         known_image_bboxes_by_page: Dict mapping page numbers to known image bboxes
+        max_workers: Scanning and rendering processes (default: MATH_CONCURRENCY
+            env var, else min(CPU count, MAX_MATH_WORKERS)); 1 disables the pools
+        drawing_cache_dir: Directory caching per-page drawing boxes by PDF
+            hash, so reruns over the same PDF skip path extraction
+        refresh_drawing_cache: Recompute and overwrite cached pages
+        image_format: Crop image format, "png", "jpeg" or "webp"
 
     Returns:
         List of metadata dicts for all extracted math regions
     """
+    # Fail before any page is scanned, not after the whole document
+    if image_format not in IMAGE_EXTENSIONS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    _ensure_image_encoder_available(image_format)
+
     pdf_path = Path(pdf_path)
     output_dir = Path(output_dir)
 
@@ -386,23 +886,41 @@ def extract_math_from_pdf(
     if ocr_latex:
         _ensure_latex_ocr_available(latex_ocr_engine)
 
+    drawing_cache = None
+    if drawing_cache_dir is not None:
+        drawing_cache = DrawingCache(
+            drawing_cache_dir, DrawingCache.hash_pdf(pdf_path), refresh=refresh_drawing_cache
+        )
+
     doc = fitz.open(str(pdf_path))
 
     try:
         # Pass 1: Collect all candidates from all pages
-        all_candidates: list[VisualCandidate] = []
-
-        for page_idx in range(len(doc)):
-            page_num = page_idx + 1
-            known_bboxes = known_image_bboxes_by_page.get(page_num, [])
+        page_indices = list(range(len(doc)))
+        workers = min(
+            max_workers or env_concurrency("MATH_CONCURRENCY", cap=MAX_MATH_WORKERS),
+            len(page_indices),
+        )
 
-            candidates = extract_equation_candidates(
-                doc,
-                page_idx,
-                known_image_bboxes=known_bboxes,
-                apply_margin_guard=True,
-            )
-            all_candidates.extend(candidates)
+        if workers <= 1 or len(page_indices) < PARALLEL_MIN_PAGES:
+            all_candidates = _scan_pages(doc, page_indices, known_image_bboxes_by_page, drawing_cache)
+        else:
+            # Pages are handed out in small runs: enough runs per worker to
+            # even out drawing-heavy pages, few enough that long documents
+            # don't pay a pool round trip per page; map() keeps page order
+            chunksize = max(1, len(page_indices) // (workers * PAGE_CHUNKS_PER_WORKER))
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_scan_worker,
+                initargs=(str(pdf_path), drawing_cache),
+            ) as executor:
+                page_results = executor.map(
+                    _scan_page_in_worker,
+                    page_indices,
+                    [known_image_bboxes_by_page.get(i + 1, []) for i in page_indices],
+                    chunksize=chunksize,
+                )
+                all_candidates = [c for candidates in page_results for c in candidates]
 
         # Pass 2: Stamp Detector - remove repetitive elements
         filtered_candidates = filter_stamps(all_candidates)
@@ -417,6 +935,8 @@ def extract_math_from_pdf(
                 ocr_latex=ocr_latex,
                 latex_ocr_engine=latex_ocr_engine,
                 drop_invalid_latex=True,
+                max_workers=max_workers,
+                image_format=image_format,
             )
 
     finally:
@@ -441,32 +961,66 @@ def _ensure_latex_ocr_available(engine: str) -> None:
         ) from e
 
 
-def latex_ocr_from_pixmap(pix: fitz.Pixmap, engine: str = "pix2tex") -> str:
-    """Convert a rendered pixmap to LaTeX using a local OCR engine."""
-    if engine != "pix2tex":
-        raise ValueError(f"Unsupported LaTeX OCR engine: {engine}")
-
+def _ensure_image_encoder_available(image_format: str) -> None:
+    """WebP crops are encoded by Pillow; fail up front instead of dropping every crop."""
+    if image_format != "webp":
+        return
     try:
-        from pix2tex.cli import LatexOCR
+        from PIL import features
     except Exception as e:
         raise RuntimeError(
-            "LaTeX OCR engine not available. Install pix2tex and pillow. "
-            "Example: pip install pix2tex pillow"
+            "WebP math crops require pillow. Install it or use png/jpeg. "
+            "Example: pip install pillow"
         ) from e
+    if not features.check("webp"):
+        raise RuntimeError("Pillow was built without WebP support; use png or jpeg math crops")
 
-    try:
-        from PIL import Image
-    except Exception as e:
-        raise RuntimeError(
-            "Pillow is required for LaTeX OCR. Install with: pip install pillow"
-        ) from e
+
+def _latex_ocr_model(engine: str = "pix2tex"):
+    """Return the process-wide LaTeX OCR model and PIL Image module, loading them once."""
+    if engine != "pix2tex":
+        raise ValueError(f"Unsupported LaTeX OCR engine: {engine}")
 
     global _LATEX_OCR
     if _LATEX_OCR is None:
-        _LATEX_OCR = LatexOCR()
+        try:
+            from pix2tex.cli import LatexOCR
+        except Exception as e:
+            raise RuntimeError(
+                "LaTeX OCR engine not available. Install pix2tex and pillow. "
+                "Example: pip install pix2tex pillow"
+            ) from e
+
+        try:
+            from PIL import Image
+        except Exception as e:
+            raise RuntimeError(
+                "Pillow is required for LaTeX OCR. Install with: pip install pillow"
+            ) from e
+
+        _LATEX_OCR = (LatexOCR(), Image)
+    return _LATEX_OCR
+
+
+def latex_ocr_from_pixmap(
+    pix: fitz.Pixmap,
+    engine: str = "pix2tex",
+    png: bytes | None = None,
+) -> str:
+    """
+    Convert a rendered pixmap to LaTeX using a local OCR engine.
+
+    png may carry the pixmap's already-encoded PNG bytes for reuse.
+    """
+    model, Image = _latex_ocr_model(engine)
 
-    image = Image.open(io.BytesIO(pix.tobytes("png")))
-    return str(_LATEX_OCR(image)).strip()
+    if pix.alpha == 0 and pix.n in (1, 3):
+        # Wrap the raw samples directly instead of a PNG encode/decode round trip
+        mode = "L" if pix.n == 1 else "RGB"
+        image = Image.frombuffer(mode, (pix.width, pix.height), pix.samples, "raw", mode, pix.stride, 1)
+    else:
+        image = Image.open(io.BytesIO(png if png is not None else pix.tobytes("png")))
+    return str(model(image)).strip()
 
 
 def _looks_like_math_text(text: str) -> bool:
@@ -474,17 +1028,18 @@ def _looks_like_math_text(text: str) -> bool:
     if not text:
         return False
 
-    if re.search(r"[=<>±+\-×*/^_]", text):
+    if _MATH_OPERATOR_RE.search(text):
         return True
-    if re.search(r"[∑∏∫√≈≤≥]", text):
+    if _MATH_SYMBOL_RE.search(text):
         return True
-    if re.search(r"[\u0370-\u03FF]", text):
+    if _GREEK_RE.search(text):
         return True  # Greek
-    if re.search(r"\d", text) and re.search(r"[()\[\]]", text):
+    has_digit = bool(_DIGIT_RE.search(text))
+    if has_digit and _BRACKET_RE.search(text):
         return True
-    if re.fullmatch(r"[A-Za-z\s]{6,}", text):
+    if _ALPHA_ONLY_RE.fullmatch(text):
         return False
-    return bool(re.search(r"\d", text))
+    return has_digit
 
 
 def _looks_like_latex_math(latex: str) -> bool:
@@ -494,36 +1049,10 @@ def _looks_like_latex_math(latex: str) -> bool:
     if len(latex) > 500:
         return False
 
-    has_digit = bool(re.search(r"\d", latex))
-    has_operator = bool(re.search(r"[=<>±+\-*/^_]", latex))
-
-    common_cmds = (
-        "\\frac",
-        "\\sum",
-        "\\int",
-        "\\sqrt",
-        "\\alpha",
-        "\\beta",
-        "\\gamma",
-        "\\delta",
-        "\\theta",
-        "\\lambda",
-        "\\mu",
-        "\\nu",
-        "\\pi",
-        "\\rho",
-        "\\sigma",
-        "\\tau",
-        "\\phi",
-        "\\psi",
-        "\\omega",
-        "\\cdot",
-        "\\times",
-        "\\mathbb",
-        "\\mathbf",
-        "\\mathrm",
-    )
-    has_common = any(cmd in latex for cmd in common_cmds)
+    has_digit = bool(_DIGIT_RE.search(latex))
+    has_operator = bool(_LATEX_OPERATOR_RE.search(latex))
+    # One alternation pass instead of a substring scan per command
+    has_common = bool(_LATEX_COMMON_CMD_RE.search(latex))
 
     if has_common and (has_digit or has_operator):
         return True
@@ -534,8 +1063,8 @@ def _looks_like_latex_math(latex: str) -> bool:
     if has_digit and (has_operator or "\\cdot" in latex or "\\times" in latex):
         return True
 
-    letters = re.findall(r"[A-Za-z]", latex)
-    nonspace = re.findall(r"[^\s]", latex)
+    letters = _LETTER_RE.findall(latex)
+    nonspace = _NON_SPACE_RE.findall(latex)
     if nonspace:
         if (len(letters) / len(nonspace)) > 0.8 and not (has_digit or has_operator):
             return False
@@ -543,6 +1072,40 @@ def _looks_like_latex_math(latex: str) -> bool:
     return has_operator or has_digit
 
 
+def _stamp_keys(candidates: list[VisualCandidate]) -> list[tuple]:
+    """
+    Round each bbox coordinate to the nearest STAMP_POSITION_TOLERANCE step.
+
+    Keys are step counts (round(v / tol)); grouping by them is the same as
+    grouping by the rounded coordinates.
+    """
+    return [
+        tuple(round(v / STAMP_POSITION_TOLERANCE) for v in cand.bbox)
+        for cand in candidates
+    ]
+
+
+def _stamp_mask(candidates: list[VisualCandidate]) -> list[bool]:
+    """
+    Vectorized stamp detection: True for candidates whose quantized position
+    occurs on STAMP_REPETITION_THRESHOLD+ distinct pages.
+    """
+    boxes = np.array([cand.bbox for cand in candidates], dtype=np.float64)
+    pages = np.array([cand.page_number for cand in candidates], dtype=np.int64)
+    # rint rounds half to even, like round()
+    steps = np.rint(boxes / STAMP_POSITION_TOLERANCE).astype(np.int64)
+
+    # Position id per candidate, then distinct (position, page) pairs, each
+    # packed into one int64 so a flat unique replaces a row-wise one
+    positions, position_ids = np.unique(steps, axis=0, return_inverse=True)
+    position_ids = position_ids.reshape(-1)
+    pages -= pages.min()
+    page_span = int(pages.max()) + 1
+    pairs = np.unique(position_ids * page_span + pages)
+    pages_per_position = np.bincount(pairs // page_span, minlength=len(positions))
+    return (pages_per_position >= STAMP_REPETITION_THRESHOLD)[position_ids].tolist()
+
+
 def filter_stamps(candidates: list[VisualCandidate]) -> list[VisualCandidate]:
     """
     Stamp Detector: Remove vector elements that appear at same position across multiple pages.
@@ -559,41 +1122,37 @@ def filter_stamps(candidates: list[VisualCandidate]) -> list[VisualCandidate]:
     if len(candidates) < STAMP_REPETITION_THRESHOLD:
         return candidates
 
+    if HAS_NUMPY and len(candidates) >= NUMPY_MIN_BOXES:
+        stamp_mask = _stamp_mask(candidates)
+        if not any(stamp_mask):
+            return candidates
+        return [cand for cand, is_stamp in zip(candidates, stamp_mask) if not is_stamp]
+
+    # Quantized positions, computed once and shared by both passes
+    keys = _stamp_keys(candidates)
+
+    # A position needs THRESHOLD+ candidates before it can span THRESHOLD+
+    # pages, so count first and only track page sets for repeated positions
+    key_counts = Counter(keys)
+    if max(key_counts.values()) < STAMP_REPETITION_THRESHOLD:
+        return candidates
+
     # Group candidates by approximate position (ignoring page number)
-    # Key: (x0_rounded, y0_rounded, x1_rounded, y1_rounded)
-    position_counts: dict[tuple, list[VisualCandidate]] = defaultdict(list)
-
-    for cand in candidates:
-        # Round to nearest tolerance increment for grouping
-        key = (
-            round(cand.bbox[0] / STAMP_POSITION_TOLERANCE) * STAMP_POSITION_TOLERANCE,
-            round(cand.bbox[1] / STAMP_POSITION_TOLERANCE) * STAMP_POSITION_TOLERANCE,
-            round(cand.bbox[2] / STAMP_POSITION_TOLERANCE) * STAMP_POSITION_TOLERANCE,
-            round(cand.bbox[3] / STAMP_POSITION_TOLERANCE) * STAMP_POSITION_TOLERANCE,
-        )
-        position_counts[key].append(cand)
+    position_pages: dict[tuple, set[int]] = defaultdict(set)
+    for key, cand in zip(keys, candidates):
+        if key_counts[key] >= STAMP_REPETITION_THRESHOLD:
+            position_pages[key].add(cand.page_number)
 
     # Find stamp positions (appear on 3+ different pages)
-    stamp_positions = set()
-    for key, cands in position_counts.items():
-        # Count unique pages
-        unique_pages = set(c.page_number for c in cands)
-        if len(unique_pages) >= STAMP_REPETITION_THRESHOLD:
-            stamp_positions.add(key)
+    stamp_positions = {
+        key for key, pages in position_pages.items()
+        if len(pages) >= STAMP_REPETITION_THRESHOLD
+    }
+    if not stamp_positions:
+        return candidates  # Usual case: no stamps, skip the filtering pass
 
     # Filter out stamps
-    filtered = []
-    for cand in candidates:
-        key = (
-            round(cand.bbox[0] / STAMP_POSITION_TOLERANCE) * STAMP_POSITION_TOLERANCE,
-            round(cand.bbox[1] / STAMP_POSITION_TOLERANCE) * STAMP_POSITION_TOLERANCE,
-            round(cand.bbox[2] / STAMP_POSITION_TOLERANCE) * STAMP_POSITION_TOLERANCE,
-            round(cand.bbox[3] / STAMP_POSITION_TOLERANCE) * STAMP_POSITION_TOLERANCE,
-        )
-        if key not in stamp_positions:
-            filtered.append(cand)
-
-    return filtered
+    return [cand for key, cand in zip(keys, candidates) if key not in stamp_positions]
 
 
 def group_math_by_page(math_metadata: list[dict]) -> dict[int, list[dict]]:
@@ -9,6 +9,7 @@ This package contains utility functions and classes for:
 - Configuration management (coming soon)
 """
 
+from .concurrency import env_concurrency
 from .exceptions import (
     AuthenticationError,
     ConfigurationError,
@@ -43,6 +44,8 @@ from .retry import (
 )
 
 __all__ = [
+    # Concurrency
+    "env_concurrency",
     # Exceptions
     "SLRException",
     "ProviderError",
@@ -0,0 +1,35 @@
+"""
+Worker-count configuration for Simple SLR.
+
+This module resolves how many worker processes a parallel stage may use,
+from an environment variable with a CPU-count fallback.
+"""
+
+import os
+from typing import Optional
+
+
+def env_concurrency(env_var: str, cap: Optional[int] = None) -> int:
+    """Number of workers for a parallel stage.
+
+    A positive integer in ``env_var`` wins; otherwise the CPU count is used,
+    limited to ``cap`` when given. Invalid values fall back to the default.
+
+    Args:
+        env_var: Name of the environment variable (e.g. ``OCR_CONCURRENCY``)
+        cap: Optional upper bound for the CPU-count default
+
+    Returns:
+        Worker count, at least 1
+
+    Example:
+        >>> workers = env_concurrency("MATH_CONCURRENCY", cap=4)
+    """
+    env_value = os.getenv(env_var)
+    if env_value:
+        try:
+            return max(1, int(env_value))
+        except ValueError:
+            pass
+    workers = os.cpu_count() or 1
+    return min(workers, cap) if cap is not None else workers
@@ -0,0 +1,150 @@
+"""
+Tests for the MatrixAgent extraction cache.
+"""
+
+import hashlib
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from nexus.extraction.matrix_agent import (
+    PROMPT_VERSION,
+    ColumnSchema,
+    ExtractionCache,
+    MatrixAgent,
+    _compress_chunk,
+    build_row_model,
+)
+
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = ExtractionCache(Path(self.test_dir) / "cache")
+        self.chunks = [
+            {"id": "c1", "text": "Abstract text", "metadata": {"section": "Abstract"}},
+            {"id": "c2", "text": "Results text", "metadata": {"section": "Results"}},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_hash_is_order_insensitive_for_keys(self):
+        reordered = [
+            {"metadata": {"section": "Abstract"}, "text": "Abstract text", "id": "c1"},
+            {"text": "Results text", "id": "c2", "metadata": {"section": "Results"}},
+        ]
+        self.assertEqual(
+            ExtractionCache.hash_chunks(self.chunks),
+            ExtractionCache.hash_chunks(reordered),
+        )
+
+    def test_hash_changes_with_content(self):
+        changed = [dict(self.chunks[0]), dict(self.chunks[1], text="Other results")]
+        self.assertNotEqual(
+            ExtractionCache.hash_chunks(self.chunks),
+            ExtractionCache.hash_chunks(changed),
+        )
+
+    def test_streamed_hash_matches_list_hash(self):
+        h = hashlib.sha256()
+        streamed = list(ExtractionCache.iter_hashed(iter(self.chunks), h))
+        self.assertEqual(streamed, self.chunks)
+        self.assertEqual(h.hexdigest(), ExtractionCache.hash_chunks(self.chunks))
+
+    def test_key_depends_on_model_and_prompt_version(self):
+        h = ExtractionCache.hash_chunks(self.chunks)
+        base = ExtractionCache.make_key("openai", "gpt-4o-mini", 1, "paper", h)
+        self.assertNotEqual(base, ExtractionCache.make_key("openai", "gpt-4o", 1, "paper", h))
+        self.assertNotEqual(base, ExtractionCache.make_key("openai", "gpt-4o-mini", 2, "paper", h))
+
+    def test_key_depends_on_prompt_and_context_settings(self):
+        h = ExtractionCache.hash_chunks(self.chunks)
+        config = ExtractionCache.hash_config("prompt", enable_compression=False, max_context_tokens=12000)
+        base = ExtractionCache.make_key("openai", "m", 1, "paper", h, config)
+        for changed in (
+            ExtractionCache.hash_config("edited prompt", enable_compression=False, max_context_tokens=12000),
+            ExtractionCache.hash_config("prompt", enable_compression=True, max_context_tokens=12000),
+            ExtractionCache.hash_config("prompt", enable_compression=False, max_context_tokens=8000),
+        ):
+            self.assertNotEqual(base, ExtractionCache.make_key("openai", "m", 1, "paper", h, changed))
+
+    def test_roundtrip(self):
+        key = ExtractionCache.make_key("openai", "m", 1, "paper", "abc")
+        self.assertIsNone(self.cache.get(key))
+
+        row = {"Paper ID": "paper", "Accuracy": 0.9}
+        self.cache.put(key, row, {"model": "m"})
+        self.assertEqual(self.cache.get(key), row)
+        self.assertEqual(list(self.cache.cache_dir.glob("*.tmp")), [])
+
+
+class TestExtractRowCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        # Bypass __init__: no OpenAI client or embedding model is needed here
+        self.agent = MatrixAgent.__new__(MatrixAgent)
+        self.agent.cache = ExtractionCache(Path(self.test_dir) / "cache")
+        self.agent.provider = "openai"
+        self.agent.model = "m"
+        self.agent._config_hash = "config"
+        self.agent.schema = mock.Mock(columns=[ColumnSchema("Accuracy", "Reported accuracy", "number")])
+        self.chunks = [{"id": "c1", "text": "Accuracy was 90%.", "metadata": {}}]
+        self.row = {"Paper ID": "paper", "Accuracy": 0.9}
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_embedder_cache_hit_skips_context(self):
+        self.agent.embedder = object()
+        key = ExtractionCache.make_key(
+            "openai", "m", PROMPT_VERSION, "paper", ExtractionCache.hash_chunks(self.chunks), "config"
+        )
+        self.agent.cache.put(key, self.row, {"model": "m"})
+        with mock.patch.object(MatrixAgent, "_prepare_context", side_effect=AssertionError("embedded")):
+            # A one-shot stream is hashed and still readable on a hit
+            self.assertEqual(self.agent.extract_row(iter(self.chunks), "paper"), self.row)
+
+
+class TestRowModel(unittest.TestCase):
+    def test_aliases_and_types(self):
+        RowModel = build_row_model([
+            ColumnSchema(name="Sample Size", description="Number of images", type="number"),
+            ColumnSchema(name="Uses Transfer Learning", description="Pretrained?", type="boolean"),
+            ColumnSchema(name="Model", description="Architecture", type="text"),
+        ])
+
+        row = RowModel.model_validate_json(
+            '{"Sample Size": 1200, "Uses Transfer Learning": true, "Model": null}'
+        )
+        self.assertEqual(
+            row.model_dump(by_alias=True),
+            {"Sample Size": 1200.0, "Uses Transfer Learning": True, "Model": None},
+        )
+        self.assertIn("Sample Size", RowModel.model_json_schema()["properties"])
+
+
+class TestCompressChunk(unittest.TestCase):
+    def test_drops_boilerplate_and_markdown(self):
+        text = (
+            "## Methods\n\nWe used a **CNN** model.\n\n---\n\n"
+            "## Acknowledgements\n\nWe thank the funders.\n\n"
+            "## Results\n\nAccuracy   was 95%."
+        )
+        self.assertEqual(
+            _compress_chunk(text, frozenset({"accuracy"})),
+            "Methods We used a CNN model. Results Accuracy was 95%.",
+        )
+
+    def test_long_chunk_keeps_keyword_sentences(self):
+        text = "Unrelated filler sentence. " * 100 + "The accuracy reached 90%."
+        self.assertEqual(
+            _compress_chunk(text, frozenset({"accuracy"})),
+            "The accuracy reached 90%.",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Tests for the PDF sanitizer.
+"""
+
+import io
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from nexus.extraction import ocr, sanitizer
+from nexus.extraction.sanitizer import (
+    PNG_SIGNATURE,
+    REFERENCE_TAIL_CHARS,
+    _jpeg_size,
+    _read_image_size,
+    clean_markdown_images,
+    detect_references_start,
+    sanitize_pdf,
+)
+
+
+def _png_header(width: int, height: int) -> bytes:
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        PNG_SIGNATURE
+        + struct.pack(">I", len(ihdr))
+        + b"IHDR"
+        + ihdr
+        + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    )
+
+
+def _jpeg_header(width: int, height: int, sof: int = 0xC0) -> bytes:
+    app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    dht = b"\x00" * 17
+    frame = struct.pack(">BHHB", 8, height, width, 3) + b"\x01\x11\x00" * 3
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0
+        # DHT sits in the SOF marker range but carries no size
+        + b"\xff\xc4" + struct.pack(">H", len(dht) + 2) + dht
+        + bytes([0xFF, sof]) + struct.pack(">H", len(frame) + 2) + frame
+        + b"\xff\xd9"
+    )
+
+
+class TestDetectReferencesStart(unittest.TestCase):
+    def test_heading_variants(self):
+        for heading in ("## References", "**References**", "# **Bibliography**", "  References", "### Works Cited"):
+            with self.subTest(heading=heading):
+                self.assertTrue(detect_references_start(f"Body text.\n{heading}\n[1] A. Author"))
+
+    def test_inline_mention_is_not_a_heading(self):
+        self.assertFalse(detect_references_start("See the references in [3] for details."))
+        self.assertFalse(detect_references_start(""))
+
+    def test_heading_in_tail_of_long_page(self):
+        body = "Body line of the discussion.\n" * (REFERENCE_TAIL_CHARS // 10)
+        self.assertTrue(detect_references_start(body + "## References\n[1] A. Author"))
+
+    def test_heading_before_tail_of_long_page(self):
+        body = "Body line of the discussion.\n" * (REFERENCE_TAIL_CHARS // 10)
+        self.assertTrue(detect_references_start("## References\n" + body))
+        self.assertFalse(detect_references_start(body + body))
+
+    def test_heading_straddling_the_tail_split(self):
+        # The split lands on a line start, so a heading line is never cut in half
+        heading = "## References\n"
+        tail = "x" * (REFERENCE_TAIL_CHARS - 5) + "\n"
+        text = "Body line.\n" * 50 + heading + tail
+        self.assertTrue(detect_references_start(text))
+
+
+class TestCleanMarkdownImages(unittest.TestCase):
+    def test_drops_lines_of_deleted_images(self):
+        text = "Here is text.\n![](images/deleted.png)\nMore text."
+        self.assertEqual(clean_markdown_images(text, set()), "Here is text.\nMore text.")
+
+    def test_keeps_valid_images(self):
+        text = "Intro\n![Figure 1](out/images/fig1.png)\nOutro"
+        self.assertEqual(clean_markdown_images(text, {"fig1.png"}), text)
+
+    def test_windows_paths_and_last_line(self):
+        text = "Intro\n![x](C:\\out\\images\\kept.png)\n![y](images/gone.png)"
+        self.assertEqual(
+            clean_markdown_images(text, {"kept.png"}),
+            "Intro\n![x](C:\\out\\images\\kept.png)\n",
+        )
+
+    def test_text_without_images_is_unchanged(self):
+        text = "No images [here](link) at all.\n"
+        self.assertEqual(clean_markdown_images(text, set()), text)
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name: str, data: bytes) -> Path:
+        path = self.test_dir / name
+        path.write_bytes(data)
+        return path
+
+    def test_png_header(self):
+        path = self._write("a.png", _png_header(640, 480) + b"\x00" * 32)
+        self.assertEqual(_read_image_size(path), (640, 480))
+
+    def test_jpeg_header(self):
+        path = self._write("a.jpg", _jpeg_header(1024, 768))
+        self.assertEqual(_read_image_size(path), (1024, 768))
+
+    def test_progressive_jpeg(self):
+        path = self._write("p.jpg", _jpeg_header(300, 200, sof=0xC2))
+        self.assertEqual(_read_image_size(path), (300, 200))
+
+    def test_jpeg_size_skips_non_frame_markers(self):
+        self.assertEqual(_jpeg_size(io.BytesIO(_jpeg_header(17, 9))), (17, 9))
+
+    def test_truncated_jpeg(self):
+        data = _jpeg_header(100, 100)
+        self.assertIsNone(_jpeg_size(io.BytesIO(data[:30])))
+        self.assertIsNone(_jpeg_size(io.BytesIO(b"\xff\xd8\x00\x00")))
+
+
+class _FakeDoc:
+    """Stand-in for a pymupdf.Document; pages only carry their index."""
+
+    page_count = 10
+
+    def __getitem__(self, index):
+        return SimpleNamespace(index=index)
+
+    def close(self):
+        pass
+
+
+def _fake_to_markdown(doc, pages=None, **kwargs):
+    """Mimic pymupdf4llm: one chunk per page, in document order, 1-based page_number."""
+    chunks = []
+    for index in sorted(set(pages if pages is not None else range(doc.page_count))):
+        # Even pages have plenty of text; odd ones look like scans
+        text = f"Text of page {index + 1}. " * (20 if index % 2 == 0 else 1)
+        chunks.append({"text": text, "metadata": {"page_number": index + 1}})
+    return chunks
+
+
+class TestSanitizePages(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.pdf = self.test_dir / "paper.pdf"
+        self.pdf.write_bytes(b"%PDF-1.7")
+        patches = [
+            mock.patch.object(sanitizer.pymupdf, "open", lambda path: _FakeDoc()),
+            mock.patch.object(sanitizer.pymupdf4llm, "to_markdown", _fake_to_markdown),
+            # OCR "reads" the index of the page that was actually rendered
+            mock.patch.object(sanitizer, "tesseract_available", lambda: True),
+            mock.patch.object(ocr, "_resolve_tesseract_cmd", lambda: "tesseract"),
+            mock.patch.object(ocr, "_render_page_image", lambda page, dpi, engine: page.index),
+            mock.patch.object(ocr, "_ocr_image", lambda index, **kwargs: f"OCR of page {index + 1}"),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def numbered_pages(self, **kwargs):
+        doc = sanitize_pdf(self.pdf, split_references=False, **kwargs)
+        return [(p.page_number, p.text.split(".")[0]) for p in doc.pages]
+
+    def test_sparse_unsorted_and_duplicate_pages(self):
+        expected = [(2, "Text of page 2"), (6, "Text of page 6")]
+        for pages in ([1, 5], [5, 1], [1, 1, 5], [5, 1, 5]):
+            with self.subTest(pages=pages):
+                self.assertEqual(self.numbered_pages(pages=pages), expected)
+
+    def test_ocr_renders_the_requested_pages(self):
+        for pages in ([1, 4, 5], [5, 4, 1, 1]):
+            with self.subTest(pages=pages):
+                self.assertEqual(
+                    self.numbered_pages(pages=pages, enable_ocr=True),
+                    [(2, "OCR of page 2"), (5, "Text of page 5"), (6, "OCR of page 6")],
+                )
+
+    def test_all_pages_by_default(self):
+        self.assertEqual([n for n, _ in self.numbered_pages()], list(range(1, 11)))
+
+    def test_invalid_page_lists(self):
+        for pages in ([], [10], [-1, 2]):
+            with self.subTest(pages=pages):
+                with self.assertRaises(ValueError):
+                    sanitize_pdf(self.pdf, pages=pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Tests for the table extractor's cell cleanup and table scoring helpers.
+"""
+
+import hashlib
+import unittest
+
+from nexus.extraction.table_extractor import (
+    _normalize_and_score,
+    clean_cell_text,
+    generate_table_id,
+    is_table_too_sparse,
+    remove_empty_rows_and_cols,
+)
+
+
+class TestCleanCellText(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(clean_cell_text(""), "")
+
+    def test_collapses_whitespace(self):
+        self.assertEqual(clean_cell_text("  12.5 \n  mg/kg\t"), "12.5 mg/kg")
+
+    def test_collapses_unicode_spaces(self):
+        # No-break and narrow no-break spaces are whitespace too
+        self.assertEqual(clean_cell_text("10\u00a0000\u202fm"), "10 000 m")
+
+
+class TestGenerateTableId(unittest.TestCase):
+    def test_id_is_stable(self):
+        # Ids are persisted in chunk metadata, so they must never change
+        self.assertEqual(generate_table_id(3, 1, "paper.pdf"), "08b641cf8705")
+
+    def test_matches_truncated_hexdigest(self):
+        expected = hashlib.sha256(b"doc.pdf:p7:t0").hexdigest()[:12]
+        self.assertEqual(generate_table_id(7, 0, "doc.pdf"), expected)
+
+    def test_distinct_per_table(self):
+        ids = {generate_table_id(p, t, "doc.pdf") for p in range(5) for t in range(5)}
+        self.assertEqual(len(ids), 25)
+
+
+class TestNormalizeAndScore(unittest.TestCase):
+    def assert_matches_unfused(self, headers, rows):
+        """The fused pass must agree with the separate cleanup helpers."""
+        new_headers, new_rows, empty_fraction, density = _normalize_and_score(headers, rows)
+        expected_rows, expected_headers = remove_empty_rows_and_cols(rows, headers)
+        self.assertEqual(new_headers, expected_headers)
+        self.assertEqual(new_rows, expected_rows)
+        for threshold in (0.0, 0.3, 0.5, 0.7, 0.9):
+            self.assertEqual(empty_fraction > threshold, is_table_too_sparse(rows, headers, threshold))
+        return density
+
+    def test_drops_empty_rows_and_columns(self):
+        headers = ["Name", "", "Value"]
+        rows = [["a", " ", "1"], ["", "", ""], ["b", "", "2"]]
+        density = self.assert_matches_unfused(headers, rows)
+        self.assertEqual(_normalize_and_score(headers, rows)[:2], (["Name", "Value"], [["a", "1"], ["b", "2"]]))
+        self.assertEqual(density, 1.0)
+
+    def test_density_counts_header_row(self):
+        headers = ["A", "B"]
+        rows = [["1", ""], ["", "2"]]
+        density = self.assert_matches_unfused(headers, rows)
+        # 4 of 6 cells (header row included) are filled
+        self.assertAlmostEqual(density, 4 / 6)
+
+    def test_ragged_rows_without_headers(self):
+        rows = [["x"], ["", "y", ""], ["", "", ""]]
+        density = self.assert_matches_unfused([], rows)
+        self.assertAlmostEqual(density, 2 / 4)
+
+    def test_no_rows(self):
+        headers, rows, empty_fraction, density = _normalize_and_score(["A", ""], [])
+        self.assertEqual((headers, rows, empty_fraction), (["A", ""], [], 1.0))
+        self.assertAlmostEqual(density, 0.5)
+
+    def test_all_empty(self):
+        headers, rows, empty_fraction, density = _normalize_and_score([], [["", " "], [""]])
+        self.assertEqual((headers, rows, empty_fraction, density), ([], [], 1.0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
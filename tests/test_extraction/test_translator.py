@@ -0,0 +1,190 @@
+"""
+Tests for the math translator's bounding-box clustering, stamp detection
+and crop format checks.
+"""
+
+import random
+import unittest
+from unittest import mock
+
+from nexus.extraction import translator
+from nexus.extraction.translator import (
+    HAS_NUMPY,
+    STAMP_REPETITION_THRESHOLD,
+    VisualCandidate,
+    _cluster_boxes,
+    filter_stamps,
+    merge_boxes,
+)
+
+if HAS_NUMPY:
+    import numpy as np
+
+    from nexus.extraction.translator import _close_pairs
+
+
+def _brute_force_close_pairs(boxes, x_tol, y_tol):
+    """Every (i < j) pair of the same closeness test, checked exhaustively."""
+    pairs = set()
+    for i, (x0, y0, x1, y1) in enumerate(boxes):
+        for j in range(i + 1, len(boxes)):
+            o_x0, o_y0, o_x1, o_y1 = boxes[j]
+            if (
+                o_y0 <= y1 + y_tol
+                and o_y1 >= y0 - y_tol
+                and o_x0 <= x1 + x_tol
+                and o_x1 >= x0 - x_tol
+            ):
+                pairs.add((i, j))
+    return pairs
+
+
+def _random_boxes(count, seed=0):
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(count):
+        x0 = rng.uniform(0, 500)
+        y0 = rng.uniform(0, 700)
+        boxes.append((x0, y0, x0 + rng.uniform(1, 15), y0 + rng.uniform(1, 8)))
+    return boxes
+
+
+class TestMergeBoxes(unittest.TestCase):
+    """Runs on the pure-Python sweep (fewer than NUMPY_MIN_BOXES boxes)."""
+
+    def test_empty(self):
+        self.assertEqual(merge_boxes([]), [])
+
+    def test_overlapping_boxes_merge(self):
+        boxes = [(0, 0, 10, 10), (5, 5, 15, 15)]
+        self.assertEqual(merge_boxes(boxes, x_tol=0, y_tol=0), [(0, 0, 15, 15)])
+
+    def test_disjoint_boxes_stay_apart(self):
+        boxes = [(0, 0, 10, 10), (100, 0, 110, 10), (0, 100, 10, 110)]
+        self.assertEqual(sorted(merge_boxes(boxes, x_tol=5, y_tol=5)), sorted(boxes))
+
+    def test_chained_boxes_merge_transitively(self):
+        # Each box is only close to its neighbour; the chain forms one region
+        boxes = [(0, 0, 10, 10), (25, 0, 35, 10), (50, 0, 60, 10)]
+        self.assertEqual(merge_boxes(boxes, x_tol=20, y_tol=0), [(0, 0, 60, 10)])
+
+    def test_merged_region_absorbs_newly_close_box(self):
+        # The third box is close to neither box alone, only to their union
+        boxes = [(0, 0, 10, 10), (30, 20, 40, 30), (45, 0, 55, 5)]
+        self.assertEqual(len(_cluster_boxes(boxes, 20, 10)), 2)
+        self.assertEqual(merge_boxes(boxes, x_tol=20, y_tol=10), [(0, 0, 55, 30)])
+
+    def test_result_is_stable(self):
+        merged = merge_boxes(_random_boxes(150, seed=1))
+        self.assertEqual(len(_cluster_boxes(merged, 20, 10)), len(merged))
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class TestMergeBoxesNumpy(unittest.TestCase):
+    """The vectorized path must group boxes exactly like the Python sweep."""
+
+    def test_close_pairs_match_brute_force(self):
+        boxes = sorted(_random_boxes(300, seed=2), key=lambda b: (b[1], b[0]))
+        arr = np.asarray(boxes, dtype=np.float64)
+        expected = _brute_force_close_pairs(boxes, 20, 10)
+        self.assertEqual(set(_close_pairs(arr, 20, 10)), expected)
+        # Small blocks split rows across several vectorized steps
+        with mock.patch.object(translator, "PAIR_BLOCK_SIZE", 7):
+            self.assertEqual(set(_close_pairs(arr, 20, 10)), expected)
+
+    def test_close_pairs_disjoint(self):
+        arr = np.asarray([(0, 0, 1, 1), (0, 100, 1, 101), (0, 200, 1, 201)], dtype=np.float64)
+        self.assertEqual(list(_close_pairs(arr, 5, 5)), [])
+
+    def test_cluster_boxes_matches_python_path(self):
+        for seed in range(3):
+            boxes = _random_boxes(400, seed=seed)
+            with mock.patch.object(translator, "HAS_NUMPY", False):
+                expected = _cluster_boxes(boxes, 20, 10)
+            self.assertEqual(_cluster_boxes(boxes, 20, 10), expected)
+
+    def test_small_sets_on_numpy_path(self):
+        with mock.patch.object(translator, "NUMPY_MIN_BOXES", 1):
+            self.assertEqual(
+                merge_boxes([(0, 0, 10, 10), (5, 5, 15, 15)], x_tol=0, y_tol=0),
+                [(0, 0, 15, 15)],
+            )
+            self.assertEqual(
+                merge_boxes([(0, 0, 10, 10), (25, 0, 35, 10), (50, 0, 60, 10)], x_tol=20, y_tol=0),
+                [(0, 0, 60, 10)],
+            )
+            disjoint = [(0, 0, 10, 10), (100, 0, 110, 10), (0, 100, 10, 110)]
+            self.assertEqual(sorted(merge_boxes(disjoint, x_tol=5, y_tol=5)), sorted(disjoint))
+
+    def test_merge_boxes_matches_python_path(self):
+        boxes = _random_boxes(500, seed=5)
+        with mock.patch.object(translator, "HAS_NUMPY", False):
+            expected = merge_boxes(boxes)
+        self.assertEqual(merge_boxes(boxes), expected)
+
+
+class TestFilterStamps(unittest.TestCase):
+    def setUp(self):
+        # A logo at (nearly) the same spot on every page, plus one equation per page
+        self.logos = [
+            VisualCandidate(page, (50 + page % 2, 20, 120, 40 - page % 2))
+            for page in range(1, 6)
+        ]
+        self.equations = [
+            VisualCandidate(page, (100, 100 + 37 * page, 300, 130 + 37 * page))
+            for page in range(1, 6)
+        ]
+        self.candidates = [c for pair in zip(self.logos, self.equations) for c in pair]
+
+    def test_removes_repeated_positions(self):
+        self.assertEqual(filter_stamps(self.candidates), self.equations)
+
+    def test_repeats_on_one_page_are_not_stamps(self):
+        same_page = [VisualCandidate(1, (10, 10, 20, 20)) for _ in range(5)]
+        self.assertEqual(filter_stamps(same_page), same_page)
+
+    def test_needs_threshold_distinct_pages(self):
+        pages = range(1, STAMP_REPETITION_THRESHOLD)
+        below = [VisualCandidate(page, (10, 10, 20, 20)) for page in pages]
+        below += [VisualCandidate(1, (10, 10, 20, 20))]
+        self.assertEqual(filter_stamps(below), below)
+
+    def test_few_candidates_pass_through(self):
+        few = self.logos[:STAMP_REPETITION_THRESHOLD - 1]
+        self.assertEqual(filter_stamps(few), few)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy_path_matches_python_path(self):
+        rng = random.Random(7)
+        candidates = list(self.candidates)
+        for _ in range(300):
+            x0, y0 = rng.choice([(50, 20), (400, 700)]) if rng.random() < 0.2 else (
+                rng.uniform(0, 500), rng.uniform(0, 700)
+            )
+            candidates.append(VisualCandidate(rng.randint(1, 12), (x0, y0, x0 + 40, y0 + 12)))
+        with mock.patch.object(translator, "HAS_NUMPY", False):
+            expected = filter_stamps(candidates)
+        self.assertLess(len(expected), len(candidates))
+        self.assertEqual(filter_stamps(candidates), expected)
+        with mock.patch.object(translator, "NUMPY_MIN_BOXES", 1):
+            self.assertEqual(filter_stamps(self.candidates), self.equations)
+
+
+class TestImageFormatChecks(unittest.TestCase):
+    def test_unknown_format_fails_before_opening_the_pdf(self):
+        with self.assertRaises(ValueError):
+            translator.extract_math_from_pdf("missing.pdf", "out", image_format="gif")
+
+    def test_webp_without_pillow_fails_up_front(self):
+        with mock.patch.dict("sys.modules", {"PIL": None}):
+            with self.assertRaises(RuntimeError):
+                translator.extract_math_from_pdf("missing.pdf", "out", image_format="webp")
+
+    def test_png_and_jpeg_need_no_extra_encoder(self):
+        with mock.patch.dict("sys.modules", {"PIL": None}):
+            translator._ensure_image_encoder_available("png")
+            translator._ensure_image_encoder_available("jpeg")
+
+
+if __name__ == "__main__":
+    unittest.main()